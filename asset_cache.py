@@ -0,0 +1,254 @@
+import pygame
+import audio
+import os
+import sys
+import time
+import struct
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# --- ASSET CACHE ------------------------------------------------------------
+# Every image is decoded and scaled to its display size once, then stored as
+# raw pixels in assets/cache. Sound effects are stored as PCM already in the
+# mixer's sample format. A cache file is only used while the content hash of
+# its source file and the target size / mixer format still match.
+#
+#   python asset_cache.py                 # build / refresh the whole cache
+#   python asset_cache.py --audio-report  # MP3 decode vs. PCM cache numbers
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(ROOT, "assets", "images")
+CACHE_DIR = os.path.join(ROOT, "assets", "cache")
+
+CACHE_MAGIC = b"MRI1"
+CACHE_HEADER = struct.Struct("<4s16sHHB")  # magic, digest, width, height, alpha
+SOUND_MAGIC = b"MRS1"
+SOUND_HEADER = struct.Struct("<4s16sI")  # magic, digest, byte length
+
+# name: (file in assets/images, display size, needs per-pixel alpha)
+IMAGES = {
+    "room": ("room.png", (1152, 768), False),
+    "pin": ("pin.png", (1152, 768), False),
+    "over": ("over.png", (1352, 768), False),
+    "switch": ("switch.png", (25, 45), True),
+    "tv_pin": ("tv_pin.png", (85, 70), True),
+    "left_door": ("left_door.png", (280, 360), True),
+    "right_door": ("right_door.png", (200, 470), True),
+    "drawer": ("drawer.png", (140, 100), True),
+    "hammer": ("hammer.png", (40, 20), True),
+}
+
+# Short effects, fully decoded into RAM from the PCM cache
+SOUNDS = {
+    "drawer": "drowerOpenSound.mp3",
+    "knock": "doorKnowking2.mp3",
+    "glass_break": "glassBroken.mp3",
+    "switch": "lightWitch.mp3",
+}
+# Background loop, streamed through pygame.mixer.music instead
+MUSIC_FILE = os.path.join(IMAGE_DIR, "horror.mp3")
+
+
+def _digest(source, *params):
+    h = hashlib.blake2b(digest_size=16)
+    with open(source, "rb") as f:
+        h.update(f.read())
+    h.update(repr(params).encode())
+    return h.digest()
+
+
+def cache_path(name):
+    return os.path.join(CACHE_DIR, name + ".raw")
+
+
+def read_cached(name, digest):
+    try:
+        with open(cache_path(name), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < CACHE_HEADER.size:
+        return None
+    magic, cached_digest, w, h, alpha = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or cached_digest != digest:
+        return None
+    pixels = memoryview(data)[CACHE_HEADER.size:]
+    fmt = "RGBA" if alpha else "RGB"
+    if len(pixels) != w * h * len(fmt):
+        return None
+    return pygame.image.frombuffer(pixels, (w, h), fmt)
+
+
+def write_cached(name, digest, surf, alpha):
+    fmt = "RGBA" if alpha else "RGB"
+    w, h = surf.get_size()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = cache_path(name) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, digest, w, h, alpha))
+            f.write(pygame.image.tobytes(surf, fmt))
+        os.replace(tmp, cache_path(name))
+    except OSError:
+        pass  # read-only media: just decode again next launch
+
+
+def decode_image(name):
+    filename, size, alpha = IMAGES[name]
+    surf = pygame.image.load(os.path.join(IMAGE_DIR, filename))
+    return pygame.transform.scale(surf, size)
+
+
+def read_image(name):
+    # Safe to call from worker threads; the surface is not display-format yet.
+    filename, size, alpha = IMAGES[name]
+    digest = _digest(os.path.join(IMAGE_DIR, filename), size, alpha)
+    surf = read_cached(name, digest)
+    if surf is None:
+        surf = decode_image(name)
+        write_cached(name, digest, surf, alpha)
+    return surf
+
+
+def convert_image(name, surf):
+    return surf.convert_alpha() if IMAGES[name][2] else surf.convert()
+
+
+def load_image(name):
+    # Returns a display-format surface; needs pygame.display.set_mode() first.
+    return convert_image(name, read_image(name))
+
+
+def sound_cache_path(name):
+    return os.path.join(CACHE_DIR, name + ".pcm")
+
+
+def read_sound(name):
+    # Sound effect from the PCM cache, decoding (and caching) the MP3 on a miss.
+    source = os.path.join(IMAGE_DIR, SOUNDS[name])
+    digest = _digest(source, pygame.mixer.get_init())
+    try:
+        with open(sound_cache_path(name), "rb") as f:
+            data = f.read()
+        magic, cached_digest, length = SOUND_HEADER.unpack_from(data)
+        if magic == SOUND_MAGIC and cached_digest == digest and len(data) == SOUND_HEADER.size + length:
+            return pygame.mixer.Sound(buffer=memoryview(data)[SOUND_HEADER.size:])
+    except (OSError, struct.error):
+        pass
+    sound = pygame.mixer.Sound(source)
+    pcm = sound.get_raw()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = sound_cache_path(name) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(SOUND_HEADER.pack(SOUND_MAGIC, digest, len(pcm)))
+            f.write(pcm)
+        os.replace(tmp, sound_cache_path(name))
+    except OSError:
+        pass
+    return sound
+
+
+def load_sound(name, volume=1.0):
+    sound = read_sound(name)
+    sound.set_volume(volume)
+    return sound
+
+
+def play_music(volume=1.0):
+    # Streamed and looped by SDL_mixer; nothing is decoded up front.
+    pygame.mixer.music.load(MUSIC_FILE)
+    pygame.mixer.music.set_volume(volume)
+    pygame.mixer.music.play(loops=-1)
+
+
+# --- BACKGROUND LOADING -----------------------------------------------------
+class AssetLoader:
+    # Decodes images and sounds on a thread pool while the main thread keeps
+    # rendering. get() blocks only if that one asset is not finished yet and
+    # does the display-format conversion on the calling (main) thread.
+
+    def __init__(self, workers=None):
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2))
+        self._futures = {}
+        self._ready = {}
+
+    def image(self, name):
+        self._futures[name] = self._pool.submit(read_image, name)
+
+    def sound(self, key, name, volume=1.0):
+        self._futures[key] = self._pool.submit(load_sound, name, volume)
+
+    def names(self):
+        return list(self._futures)
+
+    def progress(self, names=None):
+        names = list(self._futures) if names is None else names
+        done = sum(1 for n in names if n in self._ready or self._futures[n].done())
+        return done, len(names)
+
+    def done(self, names=None):
+        done, total = self.progress(names)
+        return done == total
+
+    def get(self, name):
+        value = self._ready.get(name)
+        if value is None:
+            value = self._futures[name].result()
+            if name in IMAGES:
+                value = convert_image(name, value)
+            self._ready[name] = value
+        return value
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_cache(names=None):
+    for name in names or list(IMAGES) + list(SOUNDS):
+        if name in SOUNDS:
+            start = time.perf_counter()
+            read_sound(name)
+            print(f"{name:12s} sound ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+            continue
+        filename, size, alpha = IMAGES[name]
+        start = time.perf_counter()
+        digest = _digest(os.path.join(IMAGE_DIR, filename), size, alpha)
+        if read_cached(name, digest) is not None:
+            print(f"{name:12s} up to date")
+            continue
+        write_cached(name, digest, decode_image(name), alpha)
+        print(f"{name:12s} built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def audio_report():
+    rows = []
+    for name, filename in SOUNDS.items():
+        start = time.perf_counter()
+        decoded = pygame.mixer.Sound(os.path.join(IMAGE_DIR, filename))
+        decode_ms = (time.perf_counter() - start) * 1000
+        read_sound(name)  # make sure the cache exists
+        start = time.perf_counter()
+        cached = read_sound(name)
+        cached_ms = (time.perf_counter() - start) * 1000
+        rows.append((name, len(decoded.get_raw()), decode_ms, len(cached.get_raw()), cached_ms))
+    start = time.perf_counter()
+    music = pygame.mixer.Sound(MUSIC_FILE)
+    rows.append(("music", len(music.get_raw()), (time.perf_counter() - start) * 1000, 0, 0.0))
+
+    print(f"mixer format {pygame.mixer.get_init()}")
+    print(f"{'sound':12s} {'before KiB':>11s} {'before ms':>10s} {'after KiB':>10s} {'after ms':>9s}")
+    for name, before_bytes, before_ms, after_bytes, after_ms in rows:
+        print(f"{name:12s} {before_bytes / 1024:11.0f} {before_ms:10.1f} {after_bytes / 1024:10.0f} {after_ms:9.1f}")
+    print(f"{'total':12s} {sum(r[1] for r in rows) / 1024:11.0f} {sum(r[2] for r in rows):10.1f} "
+          f"{sum(r[3] for r in rows) / 1024:10.0f} {sum(r[4] for r in rows):9.1f}")
+    print("(music is streamed after the change, so it has no resident PCM or up-front decode)")
+
+
+if __name__ == "__main__":
+    audio.pre_init()
+    pygame.init()
+    if sys.argv[1:] == ["--audio-report"]:
+        audio_report()
+    else:
+        build_cache(sys.argv[1:])
+    pygame.quit()
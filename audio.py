@@ -0,0 +1,115 @@
+import pygame
+import os
+import sys
+
+# --- MIXER SETTINGS ---------------------------------------------------------
+# The buffer is the main latency knob: a triggered sound is mixed into the
+# next buffer, so it adds buffer / frequency of delay (512 / 22050 = 23 ms)
+# on top of whatever the device queues. Smaller = snappier effects, but too
+# small crackles on slow machines. Tune per kiosk with MYSTERY_ROOM_AUDIO_BUFFER;
+# "python audio.py 256 512 1024" prints what each size costs.
+MIXER_FREQUENCY = 22050
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = int(os.environ.get("MYSTERY_ROOM_AUDIO_BUFFER", "512"))
+
+
+def pre_init(buffer=None):
+    # Must run before pygame.init(), which opens the mixer with its defaults.
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, buffer or MIXER_BUFFER)
+
+
+# --- PRIORITIES -------------------------------------------------------------
+AMBIENCE = 0  # background loop, streamed via pygame.mixer.music
+ONESHOT = 1   # world sounds: drawer, knocks, glass
+UI = 2        # switches and other direct feedback
+
+# Mixer channels owned by each group; the groups never borrow from each other
+GROUP_CHANNELS = {UI: 2, ONESHOT: 4}
+
+
+class AudioManager:
+    # Every effect is registered with a group and a voice cap. When a sound is
+    # at its cap, "ignore" drops the new trigger and "restart" reuses the
+    # sound's oldest voice. When a group is out of channels the oldest voice
+    # of the lowest-priority sound in that group is stolen, so which sound
+    # gets cut is always the same for the same sequence of triggers.
+
+    def __init__(self, group_channels=None):
+        group_channels = group_channels or GROUP_CHANNELS
+        total = sum(group_channels.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)  # keep pygame's Sound.play() off our channels
+        self._group_channels = {}
+        index = 0
+        for group in sorted(group_channels, reverse=True):
+            self._group_channels[group] = [pygame.mixer.Channel(index + i) for i in range(group_channels[group])]
+            index += group_channels[group]
+        self._sounds = {}
+        self._voices = {}  # channel -> (name, priority, trigger sequence)
+        self._sequence = 0
+
+    def add(self, name, sound, group=ONESHOT, priority=0, max_voices=1, policy="ignore"):
+        self._sounds[name] = (sound, group, priority, max_voices, policy)
+
+    def _reap(self, channels):
+        for channel in channels:
+            if channel in self._voices and not channel.get_busy():
+                del self._voices[channel]
+
+    def play(self, name):
+        sound, group, priority, max_voices, policy = self._sounds[name]
+        channels = self._group_channels[group]
+        self._reap(channels)
+        self._sequence += 1
+
+        own = sorted((v[2], ch) for ch, v in self._voices.items() if v[0] == name)
+        if len(own) >= max_voices:
+            if policy == "ignore":
+                return None
+            channel = own[0][1]
+        else:
+            channel = next((ch for ch in channels if ch not in self._voices), None)
+            if channel is None:
+                victims = sorted((self._voices[ch][1], self._voices[ch][2], i, ch)
+                                 for i, ch in enumerate(channels) if self._voices[ch][1] <= priority)
+                if not victims:
+                    return None
+                channel = victims[0][3]
+
+        channel.stop()
+        channel.play(sound)
+        self._voices[channel] = (name, priority, self._sequence)
+        return channel
+
+    def is_playing(self, name):
+        return any(v[0] == name and ch.get_busy() for ch, v in self._voices.items())
+
+    def stop(self, name):
+        for channel, voice in list(self._voices.items()):
+            if voice[0] == name:
+                channel.stop()
+                del self._voices[channel]
+
+    def stop_all(self):
+        for channel in list(self._voices):
+            channel.stop()
+        self._voices.clear()
+        pygame.mixer.music.stop()
+
+
+# --- BUFFER SWEEP -----------------------------------------------------------
+# Opens the mixer with each buffer size and prints the latency it adds, at
+# the frequency the device actually gave (it may not be MIXER_FREQUENCY).
+# The device's own queue comes on top; pygame has no way to read it.
+def sweep(buffers):
+    for buffer in buffers:
+        pre_init(buffer)
+        pygame.mixer.init()
+        frequency = pygame.mixer.get_init()[0]
+        print(f"buffer {buffer:5d} frames at {frequency} Hz: {buffer / frequency * 1000:5.1f} ms")
+        pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    sweep([int(b) for b in sys.argv[1:]] or [MIXER_BUFFER])
@@ -0,0 +1,97 @@
+# Draw cost of each render branch of main.py (room, keypad open, lights
+# off, game won) and the cost of dispatching a click / keypad key.
+#
+# Imports main.py under SDL's dummy drivers and runs its init() (window,
+# assets, sounds), then measures against the live module state (ENGINE,
+# draw_frame, handle_click, ...) without entering the main loop. Prints one
+# JSON line.
+#
+#   python benchmarks/bench_frames.py [iterations]
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, ROOT)
+
+import pygame
+
+# State of each render branch, as room variables over the initial state
+BRANCHES = {
+    "room": {},
+    "keypad": {"keypad_active": True},
+    "lights_off": {"glass_case_intact": False, "room_power_on": False},
+    "won": {"left_door_unlocked_visual": True, "game_won": True},
+}
+
+
+def timed(fn, setup=None):
+    # (mean, p95, p99) in ms
+    times = []
+    for _ in range(ITERATIONS):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    n = len(times)
+    return sum(times) / n, times[(n - 1) * 95 // 100], times[(n - 1) * 99 // 100]
+
+
+def record(results, name, stats):
+    for label, value in zip(("mean_ms", "p95_ms", "p99_ms"), stats):
+        results[f"{name}.{label}"] = round(value, 6)
+
+
+def measure(g):
+    results = {}
+    engine, room, screen = g["ENGINE"], g["ROOM"], g["screen"]
+    for name in g["LATE_ASSETS"]:
+        g["ASSETS"].get(name)  # so no branch waits for the game-over art
+    g["draw_frame"](False)
+
+    for branch, values in BRANCHES.items():
+        bits = engine.initial
+        for name, value in values.items():
+            bits = room.put(bits, name, value)
+        engine.game.restore(bits)
+        screen.set_clip(None)
+        record(results, f"draw.{branch}", timed(lambda: g["draw_frame"](False)))
+
+    hotspots = g["HOTSPOTS"]
+    miss = next((x, 150) for x in range(0, 1152, 8) if hotspots.hit((x, 150)) is None)
+    drawer = g["DRAWER_RECT"].center
+    engine.reset()
+    record(results, "dispatch.click_miss", timed(lambda: g["handle_click"](miss)))
+    record(results, "dispatch.click_hotspot", timed(lambda: g["handle_click"](drawer), engine.reset))
+
+    keypad = room.put(engine.initial, "keypad_active", True)
+    digit = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_5, unicode="5", mod=0)
+    backspace = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="", mod=0)
+    engine.game.restore(keypad)
+    record(results, "dispatch.key_digit", timed(lambda: g["handle_otp_keydown"](digit),
+                                                lambda: engine.game.restore(keypad)))
+    record(results, "dispatch.key_backspace", timed(lambda: g["handle_otp_keydown"](backspace),
+                                                    lambda: engine.game.set_digit(0, "5")))
+    engine.reset()
+    return results
+
+
+def main():
+    os.chdir(ROOT)
+    import main as room
+    room.init()
+    results = measure(vars(room))
+    room.shutdown()
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
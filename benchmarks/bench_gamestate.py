@@ -0,0 +1,59 @@
+# Snapshot / restore cost of the packed GameState vs. copying the same
+# state held as separate values (what reset_game() used to reassign), and
+# the memory one undo step takes in each form.
+#
+#   python benchmarks/bench_gamestate.py [iterations]
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from gamestate import GameState, History
+from rooms import load_room
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    os.chdir(ROOT)
+    room = load_room("main")
+    game = GameState(room)
+    for name in ("drawer", "hammer", "inventory_slot", "keypad"):
+        game.fire(room.ids[name])
+    game.set_digit(0, "6")
+    values = dict(room.decode(game.bits), otp_digits=list(game.otp_digits))
+
+    packed = game.snapshot()
+    packed_us = timed(lambda: game.restore(game.snapshot())) * 1e6
+    dict_us = timed(lambda: values.update({k: (v[:] if isinstance(v, list) else v)
+                                           for k, v in values.items()})) * 1e6
+    hash_us = timed(lambda: hash(game.snapshot())) * 1e6
+
+    history = History(64 * 1024, game.width)
+    push_us = timed(lambda: history.push(packed)) * 1e6
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [{k: (v[:] if isinstance(v, list) else v) for k, v in values.items()} for _ in range(1000)]
+    per_dict = (tracemalloc.get_traced_memory()[0] - before) / len(copies)
+    tracemalloc.stop()
+
+    print(f"state: {room.bits} room bits + keypad code = {game.width} bits")
+    print(f"snapshot + restore: packed int {packed_us:6.3f} us   dict of values {dict_us:6.3f} us")
+    print(f"hash: {hash_us:6.3f} us   history push: {push_us:6.3f} us")
+    print(f"undo step: {history.capacity} steps in 64 KB ({history.size} bytes each)"
+          f" vs ~{per_dict:.0f} bytes per dict copy")
+
+
+if __name__ == "__main__":
+    main()
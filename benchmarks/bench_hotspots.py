@@ -0,0 +1,56 @@
+# Click lookup cost: a HotspotIndex vs. the old first-match if-chain (a
+# linear scan in priority order), for rooms with more and more hotspots.
+#
+#   python benchmarks/bench_hotspots.py [clicks]
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from hotspots import HotspotIndex
+
+CLICKS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+SIZE = (1352, 768)
+
+
+def main():
+    for count in (10, 100, 1000):
+        rng = random.Random(count)
+        spots = []
+        for i in range(count):
+            w, h = rng.randint(20, 160), rng.randint(20, 160)
+            rect = pygame.Rect(rng.randrange(SIZE[0] - w), rng.randrange(SIZE[1] - h), w, h)
+            spots.append((f"spot{i}", rect, rng.randrange(3), rng.random() < 0.8))
+        clicks = [(rng.randrange(SIZE[0]), rng.randrange(SIZE[1])) for _ in range(CLICKS)]
+
+        index = HotspotIndex(SIZE)
+        for name, rect, z, on in spots:
+            index.add(name, rect, lambda: None, z=z, enabled=lambda on=on: on)
+        start = time.perf_counter()
+        found = [index.hit(pos) for pos in clicks]
+        indexed = (time.perf_counter() - start) / CLICKS
+
+        chain = sorted(spots, key=lambda s: -s[2])  # stable: ties keep add order
+        start = time.perf_counter()
+        linear = []
+        for pos in clicks:
+            hit = None
+            for name, rect, z, on in chain:
+                if rect.collidepoint(pos) and on:
+                    hit = name
+                    break
+            linear.append(hit)
+        scanned = (time.perf_counter() - start) / CLICKS
+
+        assert [s.name if s else None for s in found] == linear
+        print(f"{count:5d} hotspots: index {indexed * 1e6:7.2f} us   "
+              f"linear {scanned * 1e6:7.2f} us   ({scanned / indexed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# What importing each game module costs, from `python -X importtime`, and a
+# check that the import does nothing else: no window, no mixer, no threads,
+# no OpenCV and no files written (in the repo or the working directory, which
+# is an empty temporary one) until the script's init() / run() is called.
+#
+#   python benchmarks/bench_imports.py [runs]
+#
+# Prints each module's import time (median of the runs) with its slowest
+# direct imports, then one JSON line for suite.py:
+#
+#   import.<module>.total_ms   the whole `import <module>`
+#   import.<module>.own_ms     minus its direct imports from outside this repo
+#                              (pygame, the stdlib), which it does not control
+#
+# Exits 1 when an import has a side effect.
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+MODULES = ("main", "deno", "sudoku")  # sudoku: also what a minigame worker imports
+TOP = 8  # direct imports listed per module
+ENV = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+# Run after the import; prints what it left behind
+PROBE = ("import sys, threading, pygame; "
+         "print(pygame.display.get_init(), pygame.mixer.get_init() is not None, "
+         "threading.active_count() - 1, 'cv2' in sys.modules)")
+
+
+def importtime(module):
+    # [(depth, name, self_us, cumulative_us)] of `import module` in a fresh interpreter
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, env=ENV,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def find(rows, module):
+    # Index of the module's own row; its imports are listed just before it
+    return max(i for i, (depth, name, _, _) in enumerate(rows) if depth == 0 and name == module)
+
+
+def direct_imports(rows, module):
+    # The rows imported by `module` itself, slowest first
+    end = find(rows, module)
+    start = max((i + 1 for i in range(end) if rows[i][0] == 0), default=0)
+    return sorted((row for row in rows[start:end] if row[0] == 1), key=lambda row: -row[3])
+
+
+def is_ours(name):
+    return os.path.exists(os.path.join(ROOT, name + ".py"))
+
+
+def snapshot(top):
+    # path -> (mtime, size) of every file under top, bytecode caches aside
+    files = {}
+    for folder, dirs, names in os.walk(top):
+        dirs[:] = [d for d in dirs if d not in (".git", "__pycache__")]
+        for name in names:
+            path = os.path.join(folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # a dangling link
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def side_effects(module):
+    env = dict(ENV, PYTHONPATH=os.path.abspath(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    before = snapshot(ROOT)
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", f"import {module}; {PROBE}"], cwd=cwd, env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        written = sorted(os.listdir(cwd))
+    after = snapshot(ROOT)
+    written += sorted(os.path.relpath(path, ROOT) for path in after if after[path] != before.get(path))
+    found = [f"writes {', '.join(written)}"] if written else []
+    if out.returncode:
+        return found + ["fails outside the repo directory"]
+    display, mixer, threads, cv2 = out.stdout.split()
+    if display == "True":
+        found.append("opens the display")
+    if mixer == "True":
+        found.append("opens the mixer")
+    if threads != "0":
+        found.append(f"starts {threads} thread(s)")
+    if cv2 == "True":
+        found.append("imports OpenCV")
+    return found
+
+
+def main():
+    results = {}
+    failed = False
+    for module in MODULES:
+        runs = sorted((importtime(module) for _ in range(RUNS)), key=lambda rows: rows[find(rows, module)][3])
+        rows = runs[len(runs) // 2]
+        imports = direct_imports(rows, module)
+        total = rows[find(rows, module)][3] / 1000
+        own = total - sum(cumulative_us for _, name, _, cumulative_us in imports if not is_ours(name)) / 1000
+        results[f"import.{module}.total_ms"] = round(total, 1)
+        results[f"import.{module}.own_ms"] = round(own, 1)
+        print(f"import {module}: {total:.1f} ms, {own:.1f} ms of it in this repo")
+        for _, name, _, cumulative_us in imports[:TOP]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        for problem in side_effects(module):
+            print(f"  SIDE EFFECT: importing {module} {problem}")
+            failed = True
+    print(json.dumps(results))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
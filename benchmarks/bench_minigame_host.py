@@ -0,0 +1,94 @@
+# Launch-to-result latency for an isolated sudoku: a cold
+# "python sudoku.py" per game vs. dispatching to a pre-warmed
+# minigame_host worker. Each game exits after its first frame
+# (MYSTERY_ROOM_STARTUP_REPORT=exit), so this measures launch overhead only.
+#
+#   python benchmarks/bench_minigame_host.py [runs]
+#
+# Ends with one JSON line for suite.py (minigame.*_ms) and exits 1 when a
+# warm launch is not down in the milliseconds (over WARM_LIMIT_MS).
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["MYSTERY_ROOM_STARTUP_REPORT"] = "exit"
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from minigame_host import MinigameHost
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+WARM_LIMIT_MS = 50  # a cold start is ~1 s; a warm one ~5 ms
+
+
+def cold_launch():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "sudoku.py"], cwd=ROOT, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"))
+    return time.perf_counter() - start
+
+
+def wait_for(host, sessions):
+    results = {}
+    while len(results) < len(sessions):
+        for result in host.poll():
+            results[result["session"]] = result
+        time.sleep(0.0005)
+    return [results[s] for s in sessions]
+
+
+def warm_launch(host, games=1):
+    start = time.perf_counter()
+    results = wait_for(host, [host.launch("sudoku") for _ in range(games)])
+    assert all("time_ms" in r for r in results), results
+    return time.perf_counter() - start
+
+
+def warm_up(host):
+    host.start()
+    while not all(w.ready for w in host._workers):
+        host.poll()
+        time.sleep(0.01)
+
+
+def main():
+    os.chdir(ROOT)
+    host = MinigameHost(workers=2, timeout=30)
+    warm_up(host)
+    warm = sorted(warm_launch(host) for _ in range(RUNS * 4))
+    pair = sorted(warm_launch(host, games=2) for _ in range(RUNS * 4))
+    host.shutdown()
+
+    # A session nobody finishes is cut off at its timeout
+    os.environ["MYSTERY_ROOM_STARTUP_REPORT"] = ""
+    host = MinigameHost(workers=1, timeout=0.2)
+    warm_up(host)
+    start = time.perf_counter()
+    hung = wait_for(host, [host.launch("sudoku")])[0]
+    timed_out = time.perf_counter() - start
+    host.shutdown()
+    os.environ["MYSTERY_ROOM_STARTUP_REPORT"] = "exit"
+
+    cold = sorted(cold_launch() for _ in range(RUNS))
+    results = {
+        "minigame.cold_ms": round(cold[len(cold) // 2] * 1e3, 2),
+        "minigame.warm_ms": round(warm[len(warm) // 2] * 1e3, 2),
+        "minigame.warm_pair_ms": round(pair[len(pair) // 2] * 1e3, 2),
+    }
+    print(f"cold python sudoku.py:       median {results['minigame.cold_ms']:8.2f} ms")
+    print(f"warm worker, 1 session:      median {results['minigame.warm_ms']:8.2f} ms")
+    print(f"warm workers, 2 concurrent:  median {results['minigame.warm_pair_ms']:8.2f} ms")
+    print(f"hung session cancelled after {timed_out * 1e3:.0f} ms: {hung}")
+    slow = results["minigame.warm_ms"] > WARM_LIMIT_MS
+    if slow:
+        print(f"REGRESSION warm launch {results['minigame.warm_ms']} ms > {WARM_LIMIT_MS} ms")
+    print(json.dumps(results))
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
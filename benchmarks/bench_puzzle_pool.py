@@ -0,0 +1,46 @@
+# Getting a puzzle at launch: generating it vs. picking a record from the
+# memory-mapped pool (built into a temp dir first, on all cores).
+#
+#   python benchmarks/bench_puzzle_pool.py [records]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from puzzle_pool import SudokuPool, build_sudoku_pool
+from sudoku_gen import DIFFICULTY, generate
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+
+def per_call(fn, seconds=1.0):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (4, 9):
+            holes = round(DIFFICULTY["medium"] * n * n)
+            path = os.path.join(tmp, f"sudoku{n}.pool")
+            start = time.perf_counter()
+            build_sudoku_pool(n, holes, RECORDS, path=path)
+            built = time.perf_counter() - start
+            pool = SudokuPool(path)
+            generated = per_call(lambda: generate(n, holes=holes, rng=rng))
+            picked = per_call(lambda: pool.pick(rng))
+            print(f"{n}x{n}: build {RECORDS} records {built:6.2f} s ({os.path.getsize(path)} bytes)"
+                  f"   generate {generated * 1e3:7.3f} ms   pool pick {picked * 1e3:7.3f} ms")
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Per-frame cost of the restart icon: live arc/polygon geometry (old) vs.
+# one blit from the pre-rendered RestartIconSheet (new).
+#
+#   python benchmarks/bench_restart_icon.py [frames]
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+from render import RestartIconSheet, draw_restart_arrow
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+CENTER = (30, 30)
+ANGLES = [(i * 20) % 740 for i in range(37)]  # idle + one full restart spin
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((1352, 768))
+    sheet = RestartIconSheet()
+
+    def geometry():
+        for angle in ANGLES:
+            draw_restart_arrow(screen, CENTER, angle)
+
+    def sprite():
+        for angle in ANGLES:
+            sheet.draw(screen, CENTER, angle)
+
+    build = timeit.timeit(RestartIconSheet, number=20) / 20
+    rounds = max(1, FRAMES // len(ANGLES))
+    old = min(timeit.repeat(geometry, number=rounds, repeat=3)) / (rounds * len(ANGLES))
+    new = min(timeit.repeat(sprite, number=rounds, repeat=3)) / (rounds * len(ANGLES))
+
+    print(f"sheet build (once): {build * 1e3:8.3f} ms")
+    print(f"geometry per frame: {old * 1e6:8.2f} us")
+    print(f"sprite per frame:   {new * 1e6:8.2f} us")
+    print(f"speedup:            {old / new:8.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Room loading and event dispatch (rooms.py): compiling the JSON vs. loading
+# the cached compiled room, for the shipped rooms and a generated pack of
+# large rooms, plus the cost of one click through the dispatch table.
+#
+#   python benchmarks/bench_rooms.py [rooms in the pack] [hotspots per room]
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import rooms
+
+PACK = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+SPOTS = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+FLAGS = 24
+
+
+def generated_room(rng):
+    flags = [f"flag{i}" for i in range(FLAGS)]
+    state = {name: False for name in flags}
+    state["mode"] = ["A", "B", "C", "D", "E"]
+    hotspots = []
+    for i in range(SPOTS):
+        a, b, c = rng.sample(flags, 3)
+        hotspots.append({
+            "name": f"spot{i}", "rect": [rng.randrange(1100), rng.randrange(700), 40, 40], "z": rng.randrange(3),
+            "when": {a: rng.random() < 0.5, "mode": rng.choice(state["mode"])},
+            "do": [
+                {"toggle": b},
+                {"when": {c: True}, "do": [{"set": {a: True}}, {"sound": "knock"}]},
+                {"when": {c: False}, "message": f"spot {i}", "ms": 1000},
+            ],
+        })
+    return {"code": "0000", "state": state, "hotspots": hotspots, "events": {}}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    os.chdir(ROOT)
+    for name in ("main", "deno"):
+        with open(rooms.room_path(name), "rb") as f:
+            source = f.read()
+        compile_ms = timed(lambda: rooms.compile_room(json.loads(source), name), 50) * 1e3
+        rooms.load_room(name)
+        load_ms = timed(lambda: rooms.load_room(name), 200) * 1e3
+        room = rooms.load_room(name)
+        ids = [room.ids[n] for _, n, _, _ in room.hotspots]
+        state = room.initial
+
+        def clicks():
+            for hotspot_id in ids:
+                room.fire(state, hotspot_id)
+        click_us = timed(clicks, 2000) / len(ids) * 1e6
+        print(f"{name:5s}: compile {compile_ms:6.2f} ms   cached load {load_ms:6.3f} ms"
+              f"   dispatch {click_us:5.2f} us/click")
+
+    # A pack of generated rooms, compiled once, then loaded from the cache
+    tmp = tempfile.mkdtemp()
+    room_dir, cache_dir = rooms.ROOM_DIR, rooms.CACHE_DIR
+    rooms.ROOM_DIR, rooms.CACHE_DIR = tmp, os.path.join(tmp, "cache")
+    try:
+        rng = random.Random(0)
+        for i in range(PACK):
+            with open(rooms.room_path(f"gen{i}"), "w") as f:
+                json.dump(generated_room(rng), f)
+        start = time.perf_counter()
+        for i in range(PACK):
+            rooms.load_room(f"gen{i}")
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        pack = [rooms.load_room(f"gen{i}") for i in range(PACK)]
+        warm = time.perf_counter() - start
+    finally:
+        rooms.ROOM_DIR, rooms.CACHE_DIR = room_dir, cache_dir
+        shutil.rmtree(tmp)
+    entries = sum(len(table) for room in pack for table in room.tables)
+    print(f"pack of {PACK} rooms x {SPOTS} hotspots ({entries} table entries):"
+          f" compile {cold * 1e3:7.1f} ms   cached load {warm * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Time-to-imports-done, time-to-first-frame and time-to-interactive of main.py.
+#
+# Launches the game under SDL's dummy drivers with
+# MYSTERY_ROOM_STARTUP_REPORT=exit and timestamps the report lines it prints,
+# so the numbers include interpreter start-up and imports.
+#
+#   python benchmarks/bench_startup.py [runs]
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+
+def launch():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               MYSTERY_ROOM_STARTUP_REPORT="exit", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, text=True)
+    stages = {}
+    for line in proc.stdout:
+        if line.startswith("startup "):
+            stages[line.split()[1]] = (time.perf_counter() - start) * 1000
+    proc.wait()
+    return stages
+
+
+def main():
+    results = [launch() for _ in range(RUNS)]
+    for stage in ("imports", "first_frame", "interactive"):
+        times = sorted(r[stage] for r in results if stage in r)
+        if times:
+            print(f"{stage:12s} min {times[0]:7.1f} ms  median {times[len(times) // 2]:7.1f} ms  ({len(times)} runs)")
+
+
+if __name__ == "__main__":
+    main()
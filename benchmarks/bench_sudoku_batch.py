@@ -0,0 +1,49 @@
+# Grids per second for bulk checking: sudoku_batch.validate_batch() /
+# solve_batch() on (N, n, n) arrays vs. calling sudoku_gen.validate() /
+# solve() once per grid. Puzzles are a few hundred generated ones tiled up
+# to N.
+#
+#   python benchmarks/bench_sudoku_batch.py [N ...]
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sudoku_batch import solve_batch, validate_batch
+from sudoku_gen import generate, solve, validate
+
+SIZES = [int(float(n)) for n in sys.argv[1:]] or [1000, 10000, 100000]
+SAMPLE = 300
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    for n in (4, 9):
+        rng = random.Random(n)
+        pairs = [generate(n, "hard", rng=rng) for _ in range(SAMPLE)]
+        puzzles = np.array([p for p, _ in pairs], dtype=np.int8)
+        solutions = np.array([s for _, s in pairs], dtype=np.int8)
+        loop_validate = timed(lambda: [validate(s, p) for p, s in pairs]) / SAMPLE
+        loop_solve = timed(lambda: [solve(p) for p, _ in pairs]) / SAMPLE
+        print(f"{n}x{n} per-grid loop: validate {1 / loop_validate:10.0f} grids/s   solve {1 / loop_solve:10.0f} grids/s")
+        for count in SIZES:
+            tiled_puzzles = np.resize(puzzles, (count, n, n))
+            tiled_solutions = np.resize(solutions, (count, n, n))
+            check = timed(lambda: validate_batch(tiled_solutions, tiled_puzzles))
+            result = []
+            fill = timed(lambda: result.append(solve_batch(tiled_puzzles)))
+            assert result[0][1].all() and (result[0][0] == tiled_solutions).all()
+            print(f"{n}x{n} N={count:<7}      validate {count / check:10.0f} grids/s   solve {count / fill:10.0f} grids/s")
+
+
+if __name__ == "__main__":
+    main()
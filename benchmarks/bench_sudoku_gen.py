@@ -0,0 +1,39 @@
+# Unique-solution puzzles generated per second for each grid size and
+# difficulty (sudoku_gen.generate), seeded so runs are comparable.
+#
+#   python benchmarks/bench_sudoku_gen.py [seconds per case]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sudoku_gen import DIFFICULTY, generate, rate
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+
+
+def main():
+    for n in (4, 9, 16):
+        for difficulty in DIFFICULTY:
+            rng = random.Random(n)
+            times = []
+            holes = guesses = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < SECONDS or not times:
+                t0 = time.perf_counter()
+                puzzle, _ = generate(n, difficulty, rng=rng)
+                times.append(time.perf_counter() - t0)
+                holes += sum(row.count(0) for row in puzzle)
+                if n < 16:
+                    guesses += rate(puzzle)
+            times.sort()
+            print(f"{n:2}x{n:<2} {difficulty:6}: {len(times) / sum(times):8.1f} puzzles/s"
+                  f"  median {times[len(times) // 2] * 1e3:7.1f} ms  max {times[-1] * 1e3:7.1f} ms"
+                  f"  holes {holes / len(times):5.1f}"
+                  + (f"  guesses {guesses / len(times):4.1f}" if n < 16 else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Hand-off latency from a correct TV PIN to the first sudoku frame:
+# the old subprocess.run(["python", "sudoku.py"]) launch vs. pushing a
+# SudokuScene onto the room's scene stack.
+#
+#   python benchmarks/bench_sudoku_handoff.py [runs]
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import pygame
+import sudoku
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+
+def subprocess_handoff():
+    env = dict(os.environ, MYSTERY_ROOM_STARTUP_REPORT="exit", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "sudoku.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in proc.stdout:
+        if line.startswith("startup first_frame"):
+            elapsed = time.perf_counter() - start
+            break
+    else:
+        raise RuntimeError("sudoku.py exited without drawing a frame")
+    proc.wait()
+    return elapsed
+
+
+def scene_handoff(screen):
+    start = time.perf_counter()
+    scene = sudoku.SudokuScene((476, 254))
+    scene.draw(screen)
+    pygame.display.update(scene.rect)
+    return time.perf_counter() - start
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((1352, 768))
+    scene_handoff(screen)  # first call also loads the fonts, like the room's first TV unlock
+    in_process = sorted(scene_handoff(screen) for _ in range(RUNS * 20))
+    spawned = sorted(subprocess_handoff() for _ in range(RUNS))
+    print(f"subprocess.run sudoku.py: median {spawned[len(spawned) // 2] * 1e3:8.2f} ms")
+    print(f"SudokuScene push:         median {in_process[len(in_process) // 2] * 1e3:8.2f} ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
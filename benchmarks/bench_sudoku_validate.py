@@ -0,0 +1,42 @@
+# Cost of keeping the conflict highlight current after one keystroke:
+# a full validate() rescan vs. an incremental Board.set(), per grid size.
+#
+#   python benchmarks/bench_sudoku_validate.py [edits]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sudoku_gen import Board, generate, validate
+
+EDITS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def main():
+    for n in (4, 9, 16):
+        rng = random.Random(n)
+        puzzle, _ = generate(n, "easy", rng=rng)
+        edits = [(rng.randrange(n), rng.randrange(n), rng.randrange(n + 1)) for _ in range(EDITS)]
+
+        board = Board(puzzle)
+        start = time.perf_counter()
+        for r, c, v in edits:
+            board.set(r, c, v)
+            board.solved()
+        incremental = (time.perf_counter() - start) / EDITS
+
+        grid = [row[:] for row in puzzle]
+        runs = max(EDITS // (n * n), 100)
+        start = time.perf_counter()
+        for r, c, v in edits[:runs]:
+            grid[r][c] = v
+            validate(grid, puzzle)
+        rescan = (time.perf_counter() - start) / runs
+
+        print(f"{n:2}x{n:<2}: validate() {rescan * 1e6:8.1f} us/edit   Board.set() {incremental * 1e6:6.2f} us/edit")
+
+
+if __name__ == "__main__":
+    main()
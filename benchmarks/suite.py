@@ -0,0 +1,207 @@
+# The benchmark suite: every number that should not silently get worse, in
+# one headless run, written to a JSON file and checked against
+# benchmarks/thresholds.json (metric -> highest acceptable value; every
+# metric is a time, lower is better).
+#
+#   startup.<script>.cold_ms / warm_ms   launch to first interactive frame of
+#                                        main.py / deno.py / sudoku.py; cold
+#                                        runs start without compiled bytecode
+#   import.<module>.*                    see bench_imports.py (also fails the
+#                                        run when an import has side effects)
+#   draw.<branch>.*, dispatch.*          see bench_frames.py
+#   minigame.*                           see bench_minigame_host.py (also fails
+#                                        the run when a warm launch is slow)
+#   gen.*                                sudoku_gen solution / puzzle making
+#
+#   python benchmarks/suite.py [--runs N] [--repeat N] [--out results.json]
+#   python benchmarks/suite.py --repeat 5 --save-thresholds 1.5
+#
+# --repeat runs the whole suite N times and checks the median of each metric.
+# --save-thresholds sets each limit to max(median x FACTOR, median + floor),
+# the floor in FLOORS_MS by metric family, and widens it to twice the spread
+# over the repeats for metrics noisier than that, so they gate loosely
+# instead of flapping. The p99s are left ungated.
+#
+# Exits 1 when a metric is over its threshold.
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from sudoku_gen import generate, random_solution
+
+THRESHOLDS = os.path.join(ROOT, "benchmarks", "thresholds.json")
+# Script -> the startup line that marks it interactive
+STARTUP = {"main.py": "interactive", "deno.py": "first_frame", "sudoku.py": "first_frame"}
+# Smallest headroom a threshold gets over its median: metrics that start
+# processes or wait on pipes move by milliseconds with the OS scheduler
+FLOORS_MS = {"startup": 200, "import": 20, "minigame": 10}
+FLOOR_MS = 0.05  # everything else: in-process calls
+
+
+def launch(script, pycache):
+    # ms from launch until the script reports itself interactive
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               MYSTERY_ROOM_STARTUP_REPORT="exit", PYGAME_HIDE_SUPPORT_PROMPT="1",
+               PYTHONPYCACHEPREFIX=pycache)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # or the warm launch is never warm
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, script], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    elapsed = None
+    for line in proc.stdout:
+        if line.split()[:2] == ["startup", STARTUP[script]]:
+            elapsed = (time.perf_counter() - start) * 1000
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError(f"{script} exited without reporting startup")
+    return elapsed
+
+
+def bench_startup(runs):
+    results = {}
+    for script in STARTUP:
+        cold, warm = [], []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as pycache:
+                cold.append(launch(script, pycache))
+                warm.append(launch(script, pycache))
+        name = script[:-3]
+        results[f"startup.{name}.cold_ms"] = round(sorted(cold)[len(cold) // 2], 1)
+        results[f"startup.{name}.warm_ms"] = round(sorted(warm)[len(warm) // 2], 1)
+    return results
+
+
+def bench_imports(runs):
+    proc = subprocess.run([sys.executable, os.path.join("benchmarks", "bench_imports.py"), str(runs)],
+                          cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if proc.returncode:
+        raise RuntimeError("bench_imports.py failed:\n" + proc.stdout)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_minigame_host(runs):
+    proc = subprocess.run([sys.executable, os.path.join("benchmarks", "bench_minigame_host.py"), str(runs)],
+                          cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if proc.returncode:
+        raise RuntimeError("bench_minigame_host.py failed:\n" + proc.stdout)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_frames(iterations):
+    out = subprocess.run([sys.executable, os.path.join("benchmarks", "bench_frames.py"), str(iterations)],
+                         cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def per_call(fn, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds or not count:
+        fn()
+        count += 1
+    return round((time.perf_counter() - start) * 1000 / count, 6)
+
+
+def bench_generation():
+    results = {}
+    for n in (4, 9):
+        rng = random.Random(n)
+        results[f"gen.solution_{n}x{n}_ms"] = per_call(lambda: random_solution(n, rng))
+        rng = random.Random(n)
+        results[f"gen.puzzle_{n}x{n}_ms"] = per_call(lambda: generate(n, "medium", rng=rng))
+    return results
+
+
+def run_all(args):
+    results = {}
+    for bench in (lambda: bench_startup(args.runs), lambda: bench_imports(args.runs),
+                  lambda: bench_minigame_host(args.runs), lambda: bench_frames(args.iterations),
+                  bench_generation):
+        results.update(bench())
+    return results
+
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def thresholds_for(repeats, factor):
+    # metric -> limit for every metric but the p99s, from the repeated runs
+    thresholds = {}
+    for name in sorted(repeats[0]):
+        if name.endswith(".p99_ms"):
+            continue
+        values = [results[name] for results in repeats]
+        middle = median(values)
+        floor = FLOORS_MS.get(name.split(".")[0], FLOOR_MS)
+        limit = max(middle * factor, middle + floor, middle + 2 * (max(values) - middle))
+        thresholds[name] = round(limit, 6)
+    return thresholds
+
+
+def check(results, thresholds):
+    # Metrics over their threshold: [(name, value, limit)]
+    return [(name, results[name], limit) for name, limit in sorted(thresholds.items())
+            if name in results and results[name] > limit]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite headless.")
+    parser.add_argument("--runs", type=int, default=3, help="launches per startup measurement")
+    parser.add_argument("--iterations", type=int, default=300, help="calls per draw / dispatch measurement")
+    parser.add_argument("--repeat", type=int, default=1, help="whole-suite runs; each metric is their median")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--thresholds", default=THRESHOLDS)
+    parser.add_argument("--save-thresholds", type=float, metavar="FACTOR",
+                        help="write the medians x FACTOR (see above) as the new thresholds")
+    args = parser.parse_args(argv)
+    if args.save_thresholds and args.repeat < 3:
+        parser.error("--save-thresholds needs --repeat 3 or more to see how noisy each metric is")
+
+    repeats = [run_all(args) for _ in range(args.repeat)]
+    results = {name: round(median([r[name] for r in repeats]), 6) for name in repeats[0]}
+    report = {
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "results": results,
+        "repeats": repeats,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_thresholds:
+        with open(args.thresholds, "w") as f:
+            json.dump(thresholds_for(repeats, args.save_thresholds), f, indent=2)
+            f.write("\n")
+    try:
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+    except FileNotFoundError:
+        thresholds = {}
+
+    for name, value in results.items():
+        limit = thresholds.get(name)
+        print(f"{name:34s} {value:10.4f}" + (f"   (limit {limit})" if limit is not None else ""))
+    failed = check(results, thresholds)
+    for name, value, limit in failed:
+        print(f"REGRESSION {name}: {value} > {limit}")
+    print(f"results written to {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
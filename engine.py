@@ -0,0 +1,103 @@
+from gamestate import GameState, History
+
+# --- ROOM ENGINE ------------------------------------------------------------
+# Runs a compiled room (rooms.py) on a GameState with no pygame involved:
+# hotspot clicks, keypad entry, delayed events and undo. Time comes from
+# `clock`, a callable returning milliseconds: pygame.time.get_ticks in the
+# game, a VirtualClock in simulations so they run faster than real time.
+# Presentation effects (messages, sounds, host hooks) go to host(kind, *args).
+
+
+class VirtualClock:
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms
+
+
+def _ignore(*effect):
+    pass
+
+
+class RoomEngine:
+    def __init__(self, room, clock, host=_ignore, code=None, undo_bytes=64 * 1024):
+        self.room = room
+        self.clock = clock
+        self.host = host
+        self.code = code or room.code
+        self.game = GameState(room)
+        self.initial = self.game.snapshot()
+        self.history = History(undo_bytes, self.game.width)
+        self.timers = {}  # event name -> due time (ms); rescheduling replaces
+
+    def reset(self):
+        self.game.restore(self.initial)
+        self.timers.clear()
+
+    def won(self):
+        return self.room.won(self.game.bits)
+
+    def enabled(self, hotspot_id):
+        return self.game.enabled(hotspot_id)
+
+    def fire(self, hotspot_id):
+        # Runs hotspot / event `hotspot_id`; False when it does not apply right now.
+        # The previous state goes onto the undo history first.
+        before = self.game.snapshot()
+        effects = self.game.fire(hotspot_id)
+        if effects is None:
+            return False
+        self.history.push(before)
+        for effect in effects:
+            if effect[0] == "after":
+                self.timers[effect[2]] = self.clock() + effect[1]
+            elif effect == ("call", "clear_code"):
+                self.game.clear_code()
+            else:
+                if effect == ("call", "reset"):
+                    self.timers.clear()
+                self.host(*effect)
+        return True
+
+    def event(self, name):
+        return self.fire(self.room.ids[name])
+
+    def update(self):
+        # Fires the delayed events that are due
+        if self.timers:
+            now = self.clock()
+            for name, due in list(self.timers.items()):
+                if now >= due:
+                    del self.timers[name]
+                    self.event(name)
+
+    def undo(self):
+        snapshot = self.history.rewind()
+        if snapshot is None:
+            return False
+        self.game.restore(snapshot)
+        return True
+
+    # --- KEYPAD ---
+    def type_digit(self, digit):
+        self.game.set_digit(self.game.cursor(), digit)
+
+    def erase_digit(self):
+        position = self.game.cursor()
+        if position > 0:
+            self.game.set_digit(position - 1, "")
+
+    def submit_code(self):
+        code = self.game.code
+        if len(code) < self.game.code_length:
+            return self.event("code_short")
+        return self.event("code_ok" if code == self.code else "code_bad")
+
+    def enter_code(self, code):
+        for digit in code:
+            self.type_digit(digit)
+        return self.submit_code()
@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import RoomEngine, VirtualClock
+from rooms import ROOM_DIR, load_room
+from simulate import MINIGAMES
+
+# --- STATE-SPACE EXPLORER ---------------------------------------------------
+# Breadth-first search over every state a room can reach, driving the same
+# RoomEngine the game uses: hotspot clicks, the right and a wrong keypad
+# code, and waiting for delayed events. Every action costs one step, so BFS
+# order already gives the shortest click sequence to the room's goal.
+# A state is one int: the room bits, a "code seen" flag above them and the
+# pending delayed events as flags above that. The flag is set once the room
+# reaches a state that shows the code (CODE_SHOWN) and stays set; the right
+# code can only be typed after that, a wrong one always. The keypad digits
+# are left out; a code is always typed and submitted in one action.
+#
+#   python explore.py                 # every room in assets/rooms
+#   python explore.py main deno -j 2
+WAIT = "wait"
+CODE = "code"
+WRONG_CODE = "wrong code"
+SKIP = ("restart",)  # going back to the start is never progress
+# The code is printed on the lights-off screen (pin.png). A room without
+# these variables has nothing to find: its code counts as seen from the start.
+CODE_SHOWN = {"room_power_on": False}
+
+
+class Explorer:
+    def __init__(self, room, skip=SKIP):
+        self.room = room
+        self.clock = VirtualClock()
+        self.engine = RoomEngine(room, self.clock, self._effect, undo_bytes=8)
+        self.width = room.bits
+        self.seen = False  # the player has seen the code
+        self.shown = CODE_SHOWN if all(name in room.fields for name in CODE_SHOWN) else {}
+        self.timer_bits = {}  # delayed event -> flag index above the seen flag
+        self.pending = []
+        self.actions = [(name, hotspot_id) for hotspot_id, name, _, _ in room.hotspots if name not in skip]
+        if "code_ok" in room.ids:
+            code = room.code or "0000"
+            wrong = "".join(str((int(d) + 1) % 10) for d in code)
+            self.actions += [(CODE, code), (WRONG_CODE, wrong)]
+        self.actions.append((WAIT, None))
+
+    def _effect(self, kind, *args):
+        if kind == "call" and args[0] in MINIGAMES:
+            self.pending.append(MINIGAMES[args[0]])
+
+    def key(self):
+        key = self.engine.game.bits & ((1 << self.width) - 1)
+        if self.seen or all(self.room.get(key, name) == value for name, value in self.shown.items()):
+            key |= 1 << self.width
+        for name in self.engine.timers:
+            if name not in self.timer_bits:
+                self.timer_bits[name] = len(self.timer_bits)
+            key |= 1 << (self.width + 1 + self.timer_bits[name])
+        return key
+
+    def load(self, key):
+        engine = self.engine
+        engine.game.bits = key & ((1 << self.width) - 1)
+        self.seen = bool(key >> self.width & 1)
+        self.clock.now = 0
+        engine.timers = {name: 1 for name, bit in self.timer_bits.items()
+                         if key >> (self.width + 1 + bit) & 1}
+
+    def step(self, key, label, arg):
+        # Key of the state after the action, or None when it does nothing
+        self.load(key)
+        engine = self.engine
+        if label == WAIT:
+            if not engine.timers:
+                return None
+            self.clock.now = 1
+            engine.update()
+        elif label in (CODE, WRONG_CODE):
+            if label == CODE and not self.seen:
+                return None
+            engine.enter_code(arg)
+            engine.game.clear_code()
+        elif not engine.fire(arg):
+            return None
+        while self.pending:
+            engine.event(self.pending.pop(0))
+        return self.key()
+
+    def explore(self):
+        room = self.room
+        start = self.key()
+        parent = {start: None}  # state -> (previous state, action)
+        edges = {}
+        fired, changed = set(), set()
+        queue = deque([start])
+        while queue:
+            key = queue.popleft()
+            out = edges[key] = []
+            for label, arg in self.actions:
+                new = self.step(key, label, arg)
+                if new is None:
+                    continue
+                fired.add(label)
+                if new == key:
+                    continue
+                changed.add(label)
+                out.append(new)
+                if new not in parent:
+                    parent[new] = (key, label)
+                    queue.append(new)
+
+        room_mask = (1 << self.width) - 1
+        wins = [key for key in parent if room.won(key & room_mask)]
+        # Reverse search from the winning states: whatever it misses is a dead end
+        incoming = {}
+        for key, out in edges.items():
+            for new in out:
+                incoming.setdefault(new, []).append(key)
+        solvable = set(wins)
+        queue = deque(wins)
+        while queue:
+            for key in incoming.get(queue.popleft(), ()):
+                if key not in solvable:
+                    solvable.add(key)
+                    queue.append(key)
+        dead = [key for key in parent if key not in solvable]
+
+        reached = {name: set() for name in room.fields}
+        for key in parent:
+            for name, value in room.decode(key & room_mask).items():
+                reached[name].add(value)
+        labels = [label for label, _ in self.actions]
+        return {
+            "room": room.name,
+            "states": len(parent),
+            "winning": len(wins),
+            "solution": self.path(parent, wins[0]) if wins else None,
+            "dead_ends": len(dead),
+            "dead_end": self.path(parent, dead[0]) if dead else None,
+            "never_fires": [label for label in labels if label not in fired and label != WAIT],
+            "no_effect": [label for label in labels if label in fired and label not in changed],
+            "unreached": {name: [v for v in values if v not in reached[name]]
+                          for name, (_, _, values) in room.fields.items()
+                          if len(reached[name]) < len(values)},
+        }
+
+    def path(self, parent, key):
+        steps = []
+        while parent[key] is not None:
+            key, label = parent[key]
+            steps.append(label)
+        return steps[::-1]
+
+
+def explore_room(name):
+    start = time.perf_counter()
+    report = Explorer(load_room(name)).explore()
+    report["ms"] = (time.perf_counter() - start) * 1000
+    return report
+
+
+def print_report(report):
+    print(f"{report['room']}: {report['states']} reachable states,"
+          f" {report['winning']} winning, {report['dead_ends']} dead ends"
+          f" ({report['ms']:.1f} ms)")
+    if report["solution"] is None:
+        print("  UNSOLVABLE: the goal is never reached")
+    else:
+        print(f"  shortest solution ({len(report['solution'])} steps): {', '.join(report['solution'])}")
+    if report["dead_end"] is not None:
+        print(f"  dead end after: {', '.join(report['dead_end']) or '(start)'}")
+    if report["never_fires"]:
+        print(f"  never usable: {', '.join(report['never_fires'])}")
+    if report["no_effect"]:
+        print(f"  never changes state: {', '.join(report['no_effect'])}")
+    for name, values in report["unreached"].items():
+        print(f"  {name} never becomes {', '.join(map(repr, values))}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Check rooms for solvability and dead ends.")
+    parser.add_argument("rooms", nargs="*")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    names = args.rooms or sorted(f[:-5] for f in os.listdir(ROOM_DIR) if f.endswith(".json"))
+
+    start = time.perf_counter()
+    if args.jobs > 1 and len(names) > 1:
+        with ProcessPoolExecutor(min(args.jobs, len(names))) as pool:
+            reports = list(pool.map(explore_room, names))
+    else:
+        reports = [explore_room(name) for name in names]
+    for report in reports:
+        print_report(report)
+    print(f"{len(names)} rooms checked in {time.perf_counter() - start:.2f} s")
+    return 0 if all(report["solution"] is not None for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
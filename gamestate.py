@@ -0,0 +1,127 @@
+import sys
+from array import array
+
+# --- GAME STATE -------------------------------------------------------------
+# The whole logical state of a room in one int: the room's variables as bit
+# fields (laid out by rooms.py) and, above them, the code typed on the
+# keypad, 4 bits per digit (0 = empty, 1..10 = "0".."9"). A snapshot is that
+# int, so snapshot / restore / compare are all O(1), and the state of every
+# room variable reads as an attribute: state.drawer_open. A GameState changes
+# in place, so it is not hashable; hash its snapshot() (or use it as the dict
+# key) instead.
+DIGIT_BITS = 4
+
+
+class GameState:
+    __slots__ = ("room", "bits", "code_length", "_code_shift")
+
+    def __init__(self, room, bits=None):
+        self.room = room
+        self.code_length = len(room.code) or 4
+        self._code_shift = room.bits
+        self.bits = room.initial if bits is None else bits
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots: the room's variables
+        try:
+            shift, width, values = self.room.fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return values[self.bits >> shift & ((1 << width) - 1)]
+
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self.room is other.room and self.bits == other.bits
+
+    __hash__ = None  # mutable; snapshots are the hashable form
+
+    def __repr__(self):
+        return f"GameState({self.room.name}, {self.room.decode(self.bits)}, code={self.code!r})"
+
+    # --- SNAPSHOTS ---
+    @property
+    def width(self):
+        return self._code_shift + self.code_length * DIGIT_BITS
+
+    def snapshot(self):
+        return self.bits
+
+    def restore(self, snapshot):
+        self.bits = snapshot
+
+    # --- ROOM ACTIONS ---
+    def enabled(self, hotspot_id):
+        return self.room.enabled(self.bits, hotspot_id)
+
+    def fire(self, hotspot_id):
+        # Effects of hotspot / event `hotspot_id` (see rooms.Room.fire), or
+        # None when it does not apply. The typed code is kept unless the room
+        # resets.
+        result = self.room.fire(self.bits, hotspot_id)
+        if result is None:
+            return None
+        self.bits, effects = result
+        return effects
+
+    # --- KEYPAD CODE ---
+    def digit(self, i):
+        value = self.bits >> (self._code_shift + i * DIGIT_BITS) & 15
+        return str(value - 1) if value else ""
+
+    @property
+    def otp_digits(self):
+        return tuple(self.digit(i) for i in range(self.code_length))
+
+    @property
+    def code(self):
+        return "".join(self.otp_digits)
+
+    def cursor(self):
+        # First empty box, or the last one when the code is complete
+        for i in range(self.code_length):
+            if not self.bits >> (self._code_shift + i * DIGIT_BITS) & 15:
+                return i
+        return self.code_length - 1
+
+    def set_digit(self, i, digit):
+        shift = self._code_shift + i * DIGIT_BITS
+        value = int(digit) + 1 if digit else 0
+        self.bits = self.bits & ~(15 << shift) | value << shift
+
+    def clear_code(self):
+        self.bits &= (1 << self._code_shift) - 1
+
+
+# --- UNDO -------------------------------------------------------------------
+class History:
+    # Ring buffer of snapshots for undo / rewind, the oldest overwritten
+    # first. States of up to 64 bits go in an array, 8 bytes each; wider ones
+    # are kept as ints, a list slot plus the int object each. Either way
+    # max_bytes / that size snapshots are kept. Nothing is recorded per frame,
+    # only when a snapshot is pushed (before each room action).
+
+    def __init__(self, max_bytes=64 * 1024, width=64):
+        self.size = 8 if width <= 64 else 8 + sys.getsizeof(1 << (width - 1))  # bytes per snapshot
+        self.capacity = max(1, max_bytes // self.size)
+        self._ring = array("Q", bytes(8 * self.capacity)) if width <= 64 else [0] * self.capacity
+        self._end = 0  # next write position
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, snapshot):
+        self._ring[self._end] = snapshot
+        self._end = (self._end + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def rewind(self, steps=1):
+        # The snapshot `steps` pushes back (dropping the newer ones), or None
+        # if the history is not that deep.
+        if steps < 1 or steps > self._count:
+            return None
+        self._end = (self._end - steps) % self.capacity
+        self._count -= steps
+        return self._ring[self._end]
+
+    def clear(self):
+        self._count = 0
@@ -0,0 +1,75 @@
+import pygame
+
+# --- HOTSPOT INDEX ----------------------------------------------------------
+# Clickable regions of a room in a uniform grid of buckets. Each bucket keeps
+# the hotspots overlapping it, highest z first (ties: first added wins), so a
+# lookup only looks at the few hotspots under the pointer however many the
+# room has. A hotspot whose enabled() is False is skipped and the click falls
+# through to whatever is below it.
+
+
+class Hotspot:
+    __slots__ = ("name", "rect", "on_click", "z", "enabled", "order")
+
+    def __init__(self, name, rect, on_click, z, enabled, order):
+        self.name = name
+        self.rect = pygame.Rect(rect)
+        self.on_click = on_click
+        self.z = z
+        self.enabled = enabled
+        self.order = order
+
+
+class HotspotIndex:
+    def __init__(self, size, cell_size=64):
+        self.cell_size = cell_size
+        self.cols = -(-size[0] // cell_size)
+        self.rows = -(-size[1] // cell_size)
+        self._buckets = [[] for _ in range(self.cols * self.rows)]
+        self._spots = {}
+        self._added = 0
+
+    def _cells(self, rect):
+        rect = rect.clip((0, 0, self.cols * self.cell_size, self.rows * self.cell_size))
+        if not rect.width or not rect.height:
+            return
+        for row in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+            for col in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+                yield row * self.cols + col
+
+    def add(self, name, rect, on_click, z=0, enabled=None):
+        # on_click() runs when the hotspot is hit; enabled() (optional) says
+        # whether it currently takes clicks at all.
+        if name in self._spots:
+            self.remove(name)
+        spot = Hotspot(name, rect, on_click, z, enabled, self._added)
+        self._added += 1
+        self._spots[name] = spot
+        for index in self._cells(spot.rect):
+            bucket = self._buckets[index]
+            bucket.append(spot)
+            bucket.sort(key=lambda s: (-s.z, s.order))
+        return spot
+
+    def remove(self, name):
+        spot = self._spots.pop(name)
+        for index in self._cells(spot.rect):
+            self._buckets[index].remove(spot)
+
+    def hit(self, pos):
+        # Topmost enabled hotspot under pos, or None
+        x, y = pos
+        col, row = x // self.cell_size, y // self.cell_size
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        for spot in self._buckets[row * self.cols + col]:
+            if spot.rect.collidepoint(pos) and (spot.enabled is None or spot.enabled()):
+                return spot
+        return None
+
+    def click(self, pos):
+        spot = self.hit(pos)
+        if spot is None:
+            return False
+        spot.on_click()
+        return True
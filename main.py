@@ -1,523 +1,727 @@
+import time
+STARTUP_T0 = time.perf_counter()  # baseline for the startup report
 import pygame
 import os
-import math 
-import cv2
-import subprocess
-import time  # For delay
-
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+import sys
+import random
+import audio
+from asset_cache import AssetLoader, play_music
+from audio import AudioManager, ONESHOT
+import sudoku
+from puzzle_pool import CodePool, codes_pool_path, open_pool
+from hotspots import HotspotIndex
+from rooms import load_room
+from engine import RoomEngine
+from render import DirtyRectRenderer, LayerCache, RestartIconSheet, render_text
+from profiler import FrameProfiler
+from scheduler import FrameScheduler
+from video import VideoPlayer
+
+# Importing this module only defines the room: nothing is initialised,
+# opened, loaded or started until init() (everything up to the first frame of
+# the main loop) or run() (init(), the loop and shutdown()).
 
 # --- CONFIG -----------------------------------------------------------------
 ROOM_WIDTH, ROOM_HEIGHT = 1152, 768
 INVENTORY_WIDTH = 200
 INVENTORY_AREA_X = ROOM_WIDTH
-
-right_door_unlocked = False
-left_door_opened_time = 0  # NEW: Track when left door opened
-game_won = False  # NEW: Game over state
-win_timer = 0  # NEW: 2 second delay
-
-pin_mode = None  
-tv_state = "OFF"
+# Set MYSTERY_ROOM_DIRTY_RECTS=0 to redraw and flip the whole screen every frame
+DIRTY_RECTS = os.environ.get("MYSTERY_ROOM_DIRTY_RECTS", "1") != "0"
+# MYSTERY_ROOM_STARTUP_REPORT=1 prints time-to-imports-done / -first-frame /
+# -interactive, "exit" also quits once the room is interactive
+# (benchmarks/bench_startup.py)
+STARTUP_REPORT = os.environ.get("MYSTERY_ROOM_STARTUP_REPORT", "")
+# MYSTERY_ROOM_MINIGAMES=process runs minigames isolated in pre-warmed worker
+# processes (minigame_host.py) instead of as overlay scenes in this window
+MINIGAMES_IN_PROCESS = os.environ.get("MYSTERY_ROOM_MINIGAMES", "scene") != "process"
+MINIGAME_TIMEOUT = 600  # seconds before a hung worker is killed
+# MYSTERY_ROOM_SEED=<n> draws the door code and the sudoku from the
+# pre-generated pools (puzzle_pool.py) with that seed; unset = the printed code
+ROOM_SEED = os.environ.get("MYSTERY_ROOM_SEED", "")
+ROOM_RNG = random.Random(int(ROOM_SEED)) if ROOM_SEED else random
+# MYSTERY_ROOM_DEBUG_UNDO=1 lets Ctrl+Z step back through room actions (for
+# testing rooms; players never get it); MYSTERY_ROOM_UNDO_KB caps the history
+DEBUG_UNDO = os.environ.get("MYSTERY_ROOM_DEBUG_UNDO", "") == "1"
+UNDO_BYTES = int(os.environ.get("MYSTERY_ROOM_UNDO_KB", "64")) * 1024
+# F3 toggles per-phase frame timing and its overlay; MYSTERY_ROOM_PROFILE=1
+# starts with it on. MYSTERY_ROOM_PROFILE_OUT=<file>.json writes the recorded
+# frames as a Chrome trace on exit, any other file name as CSV (profiler.py)
+PROFILE = os.environ.get("MYSTERY_ROOM_PROFILE", "") == "1"
+PROFILE_OUT = os.environ.get("MYSTERY_ROOM_PROFILE_OUT", "")
+# The loop only runs at 60 fps while something moves and otherwise sleeps
+# until input or the next deadline (scheduler.py); MYSTERY_ROOM_IDLE=0 keeps
+# it ticking at 60 fps all the time
+IDLE = os.environ.get("MYSTERY_ROOM_IDLE", "1") != "0"
+# Frames drawn per second at most (MYSTERY_ROOM_FPS); game logic and timers
+# run at the same speed whatever it is
+RENDER_FPS = int(os.environ.get("MYSTERY_ROOM_FPS", "60"))
+# The switched-on TV plays assets/videos/tv.mp4 (video.py);
+# MYSTERY_ROOM_TV_VIDEO=0 shows the still picture instead
+TV_VIDEO = os.environ.get("MYSTERY_ROOM_TV_VIDEO", "1") != "0"
+TV_VIDEO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "videos", "tv.mp4")
 
 SCREEN_WIDTH, SCREEN_HEIGHT = ROOM_WIDTH + INVENTORY_WIDTH, ROOM_HEIGHT
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Mystery Room")
-clock = pygame.time.Clock()
-
-# --- LOAD BACKGROUND --------------------------------------------------------
-BG_PATH = os.path.join("assets", "images", "room.png")
-room_bg_raw = pygame.image.load(BG_PATH).convert()
-room_bg = pygame.transform.scale(room_bg_raw, (ROOM_WIDTH, ROOM_HEIGHT))
-
-# --- LOAD ALL IMAGES --------------------------------------------------------
-PIN_IMG_PATH = os.path.join("assets", "images", "pin.png")
-SWITCH_IMG_PATH = os.path.join("assets", "images", "switch.png")
-TV_PIN_IMG_PATH = os.path.join("assets", "images", "tv_pin.png")
-LEFT_DOOR_IMG_PATH = os.path.join("assets", "images", "left_door.png")
-RIGHT_DOOR_IMG_PATH = os.path.join("assets", "images", "right_door.png")  # NEW
-OVER_IMG_PATH = os.path.join("assets", "images", "over.png")  # NEW
-
-pin_img_raw = pygame.image.load(PIN_IMG_PATH).convert()
-pin_img = pygame.transform.scale(pin_img_raw, (ROOM_WIDTH, ROOM_HEIGHT))
-switch_img_raw = pygame.image.load(SWITCH_IMG_PATH).convert_alpha()
-switch_img = pygame.transform.scale(switch_img_raw, (25, 45))
-tv_pin_img_raw = pygame.image.load(TV_PIN_IMG_PATH).convert_alpha()
-tv_pin_img = pygame.transform.scale(tv_pin_img_raw, (85, 70))
-left_door_img_raw = pygame.image.load(LEFT_DOOR_IMG_PATH).convert_alpha()
-left_door_img = pygame.transform.scale(left_door_img_raw, (280, 360))
-
-# NEW IMAGES
-right_door_img = pygame.image.load(RIGHT_DOOR_IMG_PATH).convert_alpha()
-right_door_img = pygame.transform.scale(right_door_img, (200, 470))
-over_img_raw = pygame.image.load(OVER_IMG_PATH).convert()
-over_img = pygame.transform.scale(over_img_raw, (SCREEN_WIDTH, SCREEN_HEIGHT))
-
-DRAWER_OPEN_IMG = pygame.image.load(os.path.join("assets", "images", "drawer.png")).convert_alpha()
-HAMMER_IMG = pygame.image.load(os.path.join("assets", "images", "hammer.png")).convert_alpha()
-
-# --- LOAD SOUNDS -------------------------------------------------------------
-DRAWER_SOUND = pygame.mixer.Sound(os.path.join("assets", "images", "drowerOpenSound.mp3"))
-DOOR_KNOCK_SOUND = pygame.mixer.Sound(os.path.join("assets", "images", "doorKnowking2.mp3"))
-HORROR_SOUND = pygame.mixer.Sound(os.path.join("assets", "images", "horror.mp3"))
-DRAWER_SOUND.set_volume(0.6)
-DOOR_KNOCK_SOUND.set_volume(0.7)
-HORROR_SOUND.set_volume(0.3)
+MINIGAME_HOST = None
+screen = None
+clock = None
+
+def open_window():
+    global MINIGAME_HOST, screen, clock
+    audio.pre_init()  # before pygame.init(), which opens the mixer
+    pygame.init()
+    # Started first so the workers warm up while the room loads
+    if not MINIGAMES_IN_PROCESS:
+        from minigame_host import MinigameHost
+        MINIGAME_HOST = MinigameHost(workers=1, timeout=MINIGAME_TIMEOUT)
+        MINIGAME_HOST.start()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Mystery Room")
+    clock = pygame.time.Clock()
+
+# --- LOAD ASSETS IN THE BACKGROUND ------------------------------------------
+# Images come pre-scaled from assets/cache (see asset_cache.py). Everything is
+# decoded on worker threads while the loading screen below is drawn.
+IMAGE_NAMES = ("room", "switch", "tv_pin", "left_door", "right_door", "drawer", "hammer", "pin", "over")
+# First needed on the lights-off / win screens; fetched on demand, not waited for
+LATE_ASSETS = ("pin", "over")
+ASSETS = None
+
+def queue_assets():
+    global ASSETS
+    ASSETS = AssetLoader()
+    for name in IMAGE_NAMES:
+        ASSETS.image(name)
+    ASSETS.sound("drawer_sound", "drawer", 0.6)
+    ASSETS.sound("knock_sound", "knock", 0.7)
 
 # --- ALL INTERACTIVE OBJECTS -------------------------------------------------
-KEYPAD_RECT = pygame.Rect(160, 260, 60, 80)
-DRAWER_RECT = pygame.Rect(550, 370, 140, 100)
-HAMMER_RECT = pygame.Rect(590, 400, 40, 20)
-LEFT_DOOR_RECT = pygame.Rect(13, 130, 160, 340)
-GLASS_CASE_RECT = pygame.Rect(295, 290, 40, 70)
-RIGHT_DOOR_RECT = pygame.Rect(910, 100, 200, 470)
-MIDDLE_RECT = pygame.Rect(580, 550, 80, 50)
-RIGHT_DOOR_TV_RECT = pygame.Rect(745, 332, 100, 80)
-
-INVENTORY_SLOT_RECT = pygame.Rect(ROOM_WIDTH + 60, 80, 80, 80)
-RESTART_RECT = pygame.Rect(10, 10, 40, 40)
-RETURN_BUTTON_RECT = pygame.Rect(SCREEN_WIDTH - 120, 200, 60, 40)
-
-# --- SCALE SPRITES ----------------------------------------------------------
-DRAWER_OPEN_IMG = pygame.transform.scale(DRAWER_OPEN_IMG, (DRAWER_RECT.width, DRAWER_RECT.height))
-HAMMER_IMG = pygame.transform.scale(HAMMER_IMG, (HAMMER_RECT.width, HAMMER_RECT.height))
+# Hotspots, state and what every click does live in assets/rooms/main.json
+# (compiled by rooms.py); the rects below come from there too, read by
+# load_room_rects() at init.
+ROOM = ROOM_RECTS = None
+KEYPAD_RECT = DRAWER_RECT = HAMMER_RECT = LEFT_DOOR_RECT = GLASS_CASE_RECT = None
+RIGHT_DOOR_RECT = MIDDLE_RECT = RIGHT_DOOR_TV_RECT = KEYPAD_BACK_RECT = None
+INVENTORY_SLOT_RECT = RESTART_RECT = RETURN_BUTTON_RECT = RESTART_ICON_RECT = None
+
+def load_room_rects():
+    global ROOM, ROOM_RECTS, KEYPAD_RECT, DRAWER_RECT, HAMMER_RECT, LEFT_DOOR_RECT, GLASS_CASE_RECT
+    global RIGHT_DOOR_RECT, MIDDLE_RECT, RIGHT_DOOR_TV_RECT, KEYPAD_BACK_RECT
+    global INVENTORY_SLOT_RECT, RESTART_RECT, RETURN_BUTTON_RECT, RESTART_ICON_RECT
+    ROOM = load_room("main")
+    ROOM_RECTS = {name: pygame.Rect(rect) for _, name, rect, _ in ROOM.hotspots}
+    KEYPAD_RECT = ROOM_RECTS["keypad"]
+    DRAWER_RECT = ROOM_RECTS["drawer"]
+    HAMMER_RECT = ROOM_RECTS["hammer"]
+    LEFT_DOOR_RECT = ROOM_RECTS["left_door"]
+    GLASS_CASE_RECT = ROOM_RECTS["glass_case"]
+    RIGHT_DOOR_RECT = ROOM_RECTS["right_door"]
+    MIDDLE_RECT = ROOM_RECTS["middle"]
+    RIGHT_DOOR_TV_RECT = ROOM_RECTS["tv"]
+    KEYPAD_BACK_RECT = ROOM_RECTS["back"]
+
+    INVENTORY_SLOT_RECT = ROOM_RECTS["inventory_slot"]
+    RESTART_RECT = ROOM_RECTS["restart"]
+    RETURN_BUTTON_RECT = ROOM_RECTS["return"]
+    RESTART_ICON_RECT = RESTART_RECT.inflate(20, 20)  # arc + arrow head overhang
+
+TOOLTIP_RECT = pygame.Rect(55, 10, 150, 30)
+INVENTORY_PANEL_RECT = pygame.Rect(ROOM_WIDTH, 0, INVENTORY_WIDTH, SCREEN_HEIGHT)
+MESSAGE_RECT = pygame.Rect(0, SCREEN_HEIGHT - 55, SCREEN_WIDTH, 45)
+SUDOKU_RECT = pygame.Rect(0, 0, sudoku.WIDTH, sudoku.SCREEN_H)
+SUDOKU_RECT.center = (ROOM_WIDTH // 2, ROOM_HEIGHT // 2)
+PROFILER_RECT = pygame.Rect(ROOM_WIDTH - 300, 10, 290, 50)
+
+# --- TIMING -----------------------------------------------------------------
+# Game logic advances in fixed STEP_MS steps on its own clock, sim_time (ms),
+# as many steps per frame as real time has passed; drawing interpolates the
+# restart spin between the last two steps. Every timer is a time in ms.
+STEP_MS = 1000 / 60
+# After a longer stall the lost time is dropped. Well above the scheduler's
+# longest idle sleep (max_sleep_ms, 1 s), so idling is never clipped.
+MAX_CATCH_UP_MS = 5000
+MESSAGE_MS = 2000
+SPIN_MS = 600  # restart icon: two turns, 20 degrees per step
+SPIN_DEG_PER_MS = 720 / SPIN_MS
+TOOLTIP_DELAY_MS = 500
+BLINK_MS = 333  # keypad cursor on, then off
+sim_time = 0.0
+accumulator = 0.0  # real time not yet run as steps
+last_ticks = 0  # pygame.time.get_ticks() when sim_time + accumulator was taken
+render_alpha = 0.0  # how far drawing is between the last two steps
+
+def sim_clock():
+    return sim_time
+
+def to_ticks(ms):
+    # The pygame.time.get_ticks() time at which sim_time reaches ms
+    return last_ticks - accumulator + (ms - sim_time)
 
 # --- GAME STATE -------------------------------------------------------------
+# The room logic runs in ENGINE (engine.py), on the sim_time clock.
+# Everything it knows, typed keypad code included, is one int in `game`
+# (gamestate.py): game.drawer_open, game.tv_state, game.otp_digits... Restart
+# restores the initial snapshot; reset_game() resets the presentation.
+ENGINE = game = None
+
+def start_engine():
+    global ENGINE, game
+    ENGINE = RoomEngine(ROOM, sim_clock, run_effect, undo_bytes=UNDO_BYTES)
+    game = ENGINE.game
+
 def reset_game():
-    global drawer_open, hammer_taken, left_door_locked, message, message_timer
-    global selected_item, keypad_active, otp_digits, door_just_touched
-    global restart_rotating, restart_angle, restart_frames, restart_hover, tooltip_timer
-    global glass_case_intact, room_power_on, tv_pin_unlocked, left_door_unlocked_visual
-    global tv_state, pin_mode, right_door_unlocked, left_door_opened_time, game_won, win_timer
+    global message, message_until
+    global restart_rotating, restart_spin_start, restart_angle, restart_prev_angle, restart_hover, hover_since
     
-    drawer_open = False
-    hammer_taken = False
-    left_door_locked = True
     message = ""
-    message_timer = 0
-    selected_item = None
-    keypad_active = False
-    otp_digits = ["", "", "", ""]
-    door_just_touched = False
+    message_until = 0
     restart_rotating = False
-    restart_angle = 0
-    restart_frames = 0
+    restart_spin_start = 0
+    restart_angle = restart_prev_angle = 0
     restart_hover = False
-    tooltip_timer = 0
-    glass_case_intact = True
-    room_power_on = True
-    tv_pin_unlocked = False
-    left_door_unlocked_visual = False
-    tv_state = "OFF"
-    pin_mode = None
-    right_door_unlocked = False
-    left_door_opened_time = 0
-    game_won = False
-    win_timer = 0
+    hover_since = None
 
 # Initialize
 reset_game()
-FONT = pygame.font.SysFont(None, 32)
-FONT_SMALL = pygame.font.SysFont(None, 24)
-FONT_TINY = pygame.font.SysFont(None, 20)
-FONT_OTP = pygame.font.SysFont(None, 48)
-CORRECT_CODE = "6554"
-OTP_CURSOR_BLINK = 0
+FONT = FONT_SMALL = FONT_TINY = FONT_OTP = FONT_CODE = None
+PIN_ART_CODE = "6554"  # printed on pin.png
+PIN_ART_CODE_RECT = pygame.Rect(405, 25, 290, 115)
+CORRECT_CODE = None
+otp_blink_since = 0  # the keypad cursor blink restarts on every digit
+
+def load_fonts():
+    global FONT, FONT_SMALL, FONT_TINY, FONT_OTP, FONT_CODE
+    FONT = pygame.font.SysFont(None, 32)
+    FONT_SMALL = pygame.font.SysFont(None, 24)
+    FONT_TINY = pygame.font.SysFont(None, 20)
+    FONT_OTP = pygame.font.SysFont(None, 48)
+    FONT_CODE = pygame.font.SysFont(None, 120)
+
+def pick_code():
+    global CORRECT_CODE
+    CORRECT_CODE = ROOM.code
+    if ROOM_SEED:
+        room_codes = open_pool(codes_pool_path(), CodePool)
+        if room_codes:
+            CORRECT_CODE = room_codes.pick(ROOM_RNG)
+    ENGINE.code = CORRECT_CODE
+
+# --- LOADING SCREEN ---------------------------------------------------------
+def report_startup(stage):
+    if STARTUP_REPORT:
+        print(f"startup {stage} {(time.perf_counter() - STARTUP_T0) * 1000:.1f} ms", flush=True)
+
+def draw_loading_screen(done, total):
+    screen.fill((0, 0, 0))
+    bar_rect = pygame.Rect(SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2, 400, 20)
+    pygame.draw.rect(screen, (60, 60, 60), bar_rect, 0)
+    pygame.draw.rect(screen, (200, 200, 200), (bar_rect.x, bar_rect.y, bar_rect.width * done // total, bar_rect.height), 0)
+    pygame.draw.rect(screen, (255, 255, 255), bar_rect, 2)
+    screen.blit(render_text(FONT, "Loading...", True, (255, 255, 255)), (bar_rect.x, bar_rect.y - 35))
+
+startup_first_frame = True
+room_bg = switch_img = tv_pin_img = left_door_img = right_door_img = DRAWER_OPEN_IMG = HAMMER_IMG = None
+TV_PLAYER = None
+tv_frame = None  # the video frame on the TV this frame, if any
+
+def wait_for_assets():
+    global startup_first_frame, room_bg, switch_img, tv_pin_img, left_door_img, right_door_img
+    global DRAWER_OPEN_IMG, HAMMER_IMG, TV_PLAYER
+    needed_assets = [name for name in ASSETS.names() if name not in LATE_ASSETS]
+    while not ASSETS.done(needed_assets):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                ASSETS.shutdown()
+                if MINIGAME_HOST:
+                    MINIGAME_HOST.shutdown()
+                pygame.quit()
+                sys.exit()
+        draw_loading_screen(*ASSETS.progress())
+        pygame.display.flip()
+        if startup_first_frame:
+            report_startup("first_frame")
+            startup_first_frame = False
+        clock.tick(60)
+
+    room_bg = ASSETS.get("room")
+    switch_img = ASSETS.get("switch")
+    tv_pin_img = ASSETS.get("tv_pin")
+    left_door_img = ASSETS.get("left_door")
+    right_door_img = ASSETS.get("right_door")  # NEW
+    DRAWER_OPEN_IMG = ASSETS.get("drawer")
+    HAMMER_IMG = ASSETS.get("hammer")
+
+    # Decoded on its own thread, only once the TV is first switched on
+    if TV_VIDEO:
+        TV_PLAYER = VideoPlayer(TV_VIDEO_FILE, tv_pin_img.get_size(),
+                                clock=pygame.time.get_ticks)
+
+# --- AUDIO ------------------------------------------------------------------
+AUDIO = None
+
+def load_sounds():
+    global AUDIO
+    AUDIO = AudioManager()
+    AUDIO.add("drawer", ASSETS.get("drawer_sound"), ONESHOT, max_voices=1, policy="restart")
+    # One knock at a time; clicks while it is still ringing are ignored
+    AUDIO.add("knock", ASSETS.get("knock_sound"), ONESHOT, priority=1, max_voices=1, policy="ignore")
+
+# --- SCALE SPRITES ----------------------------------------------------------
+INV_HAMMER_IMG = RESTART_ICON = None
 
-HORROR_SOUND.play(loops=-1)
+def scale_sprites():
+    global INV_HAMMER_IMG, RESTART_ICON
+    INV_HAMMER_IMG = pygame.transform.scale(HAMMER_IMG, (INVENTORY_SLOT_RECT.width - 20, INVENTORY_SLOT_RECT.height - 20))
+    RESTART_ICON = RestartIconSheet(size=RESTART_ICON_RECT.width)  # all 18 spin poses, drawn once
 
 # --- HELPERS ----------------------------------------------------------------
 def stop_foreground_sounds():
-    global door_just_touched
-    DOOR_KNOCK_SOUND.stop()
-    door_just_touched = False
+    AUDIO.stop("knock")
 
-def set_message(text, frames=120):
-    global message, message_timer
+def set_message(text, ms=MESSAGE_MS):
+    global message, message_until
     message = text
-    message_timer = frames
+    message_until = sim_time + ms
+
+# --- SCENES -----------------------------------------------------------------
+# Minigames run as overlay scenes inside this window; the room keeps updating
+# underneath while the top scene gets the input.
+scene_stack = []  # (scene, on_done callback)
+minigame_sessions = {}  # MINIGAME_HOST session id -> on_done callback
+
+def push_scene(scene, on_done):
+    scene_stack.append((scene, on_done))
+
+def update_scenes():
+    while scene_stack and scene_stack[-1][0].done:
+        scene, on_done = scene_stack.pop()
+        on_done(scene.summary())
+    if scene_stack:
+        scene_stack[-1][0].update()
+    if MINIGAME_HOST:
+        for result in MINIGAME_HOST.poll():
+            on_done = minigame_sessions.pop(result["session"], None)
+            if on_done:
+                on_done(result)
+
+def start_minigame(game, scene_factory, on_done):
+    # on_done(result) gets a dict: solved, time_ms, moves, errors
+    # (or solved=False + "cancelled" when a worker timed out or died).
+    if MINIGAMES_IN_PROCESS:
+        push_scene(scene_factory(), on_done)
+    else:
+        minigame_sessions[MINIGAME_HOST.launch(game)] = on_done
+
+def on_sudoku_done(result):
+    if result["solved"]:
+        ENGINE.event("sudoku_solved")
 
 # --- FIXED BACK BUTTON HANDLING ---------------------------------------------
-def get_back_rect():
-    if keypad_active:
-        panel_width, panel_height = 400, 160
-        panel_rect = pygame.Rect((ROOM_WIDTH - panel_width) // 2, ROOM_HEIGHT - panel_height - 40, panel_width, panel_height)
-        return pygame.Rect(panel_rect.x + panel_width - 40, panel_rect.y + 10, 30, 30)
-    return None
+def get_keypad_panel_rect():
+    panel_width, panel_height = 400, 160
+    return pygame.Rect((ROOM_WIDTH - panel_width) // 2, ROOM_HEIGHT - panel_height - 40, panel_width, panel_height)
 
 # --- OTP INPUT HANDLING (UNCHANGED) -----------------------------------------
 def handle_otp_keydown(event):
-    global otp_digits, keypad_active, OTP_CURSOR_BLINK
-    global left_door_locked, left_door_unlocked_visual
-    global tv_pin_unlocked, pin_mode, right_door_unlocked, left_door_opened_time
+    global otp_blink_since
 
-    if not keypad_active:
+    if not game.keypad_active:
         return
 
-    current_pos = next((i for i, d in enumerate(otp_digits) if d == ""), 3)
-
     if event.key in (pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3,
                      pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_7,
                      pygame.K_8, pygame.K_9):
-        if current_pos < 4:
-            otp_digits[current_pos] = event.unicode
-            OTP_CURSOR_BLINK = 0
+        ENGINE.type_digit(str(event.key - pygame.K_0))
+        otp_blink_since = sim_time
 
     elif event.key == pygame.K_BACKSPACE:
-        if current_pos > 0:
-            otp_digits[current_pos - 1] = ""
+        ENGINE.erase_digit()
 
     elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-        code = "".join(otp_digits)
-
-        if len(code) == 4:
-            if pin_mode == "DOOR":
-                if code == CORRECT_CODE:
-                    left_door_locked = False
-                    left_door_unlocked_visual = True
-                    left_door_opened_time = pygame.time.get_ticks()  # NEW: Start timer
-                    set_message("Door unlocked! 🚪", 180)
-                else:
-                    set_message("Wrong door code ❌", 120)
-
-            elif pin_mode == "TV":
-                if code == CORRECT_CODE:
-                    tv_state = "UNLOCKED"
-                    set_message("TV unlocked 📺", 180)
-                    result = subprocess.run(["python", "sudoku.py"])
-                    if result.returncode == 0:
-                        right_door_unlocked = True
-                        set_message("Right door unlocked! 🚪", 180)
-                else:
-                    set_message("Wrong TV PIN ❌", 120)
-
-        otp_digits = ["", "", "", ""]
-        keypad_active = False
-        pin_mode = None
-
-# --- COMPLETE CLICK HANDLING (FIXED) ----------------------------------------
+        ENGINE.submit_code()
+
+# --- CLICK HANDLING ---------------------------------------------------------
+# Clicks and keypad results are looked up in the room's dispatch table
+# (rooms.py). The table changes `game` and hands back effects: messages,
+# sounds and calls to the hooks below.
+def spin_restart():
+    global restart_rotating, restart_spin_start, restart_angle, restart_prev_angle
+    restart_rotating = True
+    restart_spin_start = sim_time
+    restart_angle = restart_prev_angle = 0
+
+def start_sudoku():
+    start_minigame("sudoku", lambda: sudoku.SudokuScene(SUDOKU_RECT.topleft, ROOM_RNG), on_sudoku_done)
+
+def show_right_door():
+    screen.blit(right_door_img, RIGHT_DOOR_RECT.topleft)
+
+ROOM_HOOKS = {
+    "reset": reset_game,
+    "stop_sounds": stop_foreground_sounds,
+    "spin_restart": spin_restart,
+    "start_sudoku": start_sudoku,
+    "show_right_door": show_right_door,
+}
+
+def run_effect(kind, *args):
+    if kind == "message":
+        set_message(*args)
+    elif kind == "sound":
+        AUDIO.play(*args)
+    else:
+        ROOM_HOOKS[args[0]]()
+
+def undo():
+    if ENGINE.undo():
+        set_message("Undo", 1000)
+
+HOTSPOTS = None
+
+def build_hotspots():
+    global HOTSPOTS
+    HOTSPOTS = HotspotIndex((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for hotspot_id, name, rect, z in ROOM.hotspots:
+        HOTSPOTS.add(name, rect, lambda hotspot_id=hotspot_id: ENGINE.fire(hotspot_id), z=z,
+                     enabled=lambda hotspot_id=hotspot_id: ENGINE.enabled(hotspot_id))
+
 def handle_click(pos):
-    global tv_state, pin_mode, keypad_active, otp_digits
-    global drawer_open, hammer_taken, selected_item, door_just_touched
-    global restart_rotating, restart_angle, restart_frames
-    global glass_case_intact, room_power_on, tv_pin_unlocked, left_door_unlocked_visual
-    global right_door_unlocked
-    
-    x, y = pos
-    
-    # FIXED BACK BUTTON
-    back_rect = get_back_rect()
-    if keypad_active and back_rect and back_rect.collidepoint(pos):
-        if pin_mode == "TV":
-            tv_state = "OFF"
-        keypad_active = False
-        otp_digits = ["", "", "", ""]
-        pin_mode = None
-        set_message("PIN closed", 60)
-        return
+    HOTSPOTS.click(pos)
 
-    # RETURN BUTTON (darkness screen)
-    if RETURN_BUTTON_RECT.collidepoint(pos) and not room_power_on:
-        room_power_on = True
-        set_message("Lights restored!", 120)
-        return
+# --- DRAWING ----------------------------------------------------------------
+def get_room_layer_key():
+    return (game.tv_state in ("IMAGE", "PIN", "UNLOCKED"), game.glass_case_intact, game.left_door_unlocked_visual,
+            game.right_door_unlocked, game.drawer_open, game.hammer_taken)
+
+def build_room_layer(key):
+    tv_on, glass_intact, left_door_open, right_door_open, drawer_is_open, hammer_gone = key
+    layer = room_bg.copy()
     
-    # Restart
-    if RESTART_RECT.collidepoint(pos):
-        stop_foreground_sounds()
-        reset_game()
-        set_message("Game Restarted! 🔄", 180)
-        restart_rotating = True
-        restart_angle = 0
-        restart_frames = 0
-        return
+    # DEBUG OUTLINES
+    # pygame.draw.rect(layer, (255, 0, 0), DRAWER_RECT, 2)
+    # pygame.draw.rect(layer, (0, 255, 0), LEFT_DOOR_RECT, 2)
+    # pygame.draw.rect(layer, (255, 128, 255), GLASS_CASE_RECT, 3)
+    # pygame.draw.rect(layer, (0, 0, 255), RIGHT_DOOR_RECT, 2)
+    # pygame.draw.rect(layer, (255, 255, 0), KEYPAD_RECT, 3)
+    # pygame.draw.rect(layer, (0, 255, 255), MIDDLE_RECT, 2)
+    # pygame.draw.rect(layer, (255, 0, 255), RIGHT_DOOR_TV_RECT, 2)
     
-    # Skip room interactions when lights off or game won
-    if not room_power_on or game_won:
-        return
-        
-    if x < ROOM_WIDTH:
-        # KEYPAD
-        if KEYPAD_RECT.collidepoint(pos):
-            stop_foreground_sounds()
-            pin_mode = "DOOR"
-            keypad_active = True
-            otp_digits = ["", "", "", ""]
-            set_message("Enter door code", 120)
-            return
-
-        # MIDDLE RECT
-        if MIDDLE_RECT.collidepoint(pos):
-            tv_state = "IMAGE"
-            set_message("TV powered on 📺", 120)
-            return
-
-        # RIGHT DOOR TV RECT
-        if RIGHT_DOOR_TV_RECT.collidepoint(pos) and tv_state == "IMAGE":
-            tv_state = "PIN"
-            pin_mode = "TV"
-            keypad_active = True
-            otp_digits = ["", "", "", ""]
-            set_message("Enter TV PIN", 120)
-            return
-
-        # GLASS CASE / SWITCH
-        if GLASS_CASE_RECT.collidepoint(pos):
-            if glass_case_intact and selected_item == "hammer":
-                glass_case_intact = False
-                stop_foreground_sounds()
-                set_message("Glass broken! 💥", 120)
-            elif not glass_case_intact:
-                room_power_on = False
-                set_message("Lights OFF! 🔌", 180)
-            else:
-                set_message("Glass case. Use hammer?", 120)
-            return
-        
-        # Hammer
-        if drawer_open and not hammer_taken and HAMMER_RECT.collidepoint(pos):
-            hammer_taken = True
-            stop_foreground_sounds()
-            set_message("Picked up hammer. 🔨", 120)
-            return
-        
-        # Drawer
-        if DRAWER_RECT.collidepoint(pos):
-            stop_foreground_sounds()
-            drawer_open = not drawer_open
-            DRAWER_SOUND.play()
-            set_message("Drawer opened." if drawer_open else "Drawer closed.", 60)
-            return
-        
-        # Left door
-        if LEFT_DOOR_RECT.collidepoint(pos) and not KEYPAD_RECT.collidepoint(pos) and not GLASS_CASE_RECT.collidepoint(pos):
-            if not door_just_touched:
-                DOOR_KNOCK_SOUND.play()
-                door_just_touched = True
-            if left_door_locked:
-                set_message("The door is locked. 🔑", 120)
-            else:
-                set_message("You opened the door! 🚪", 180)
-            return
-        
-        # Right door
-        if RIGHT_DOOR_RECT.collidepoint(pos):
-            if not door_just_touched:
-                DOOR_KNOCK_SOUND.play()
-                door_just_touched = True
-            if right_door_unlocked:
-                screen.blit(right_door_img, RIGHT_DOOR_RECT.topleft)
-                set_message("The door opens! 🚪", 180)
-            else:
-                set_message("The door is locked. 🔒", 120)
-            return
+    # SMALL KEYPAD boxes (digits are drawn per frame)
+    pygame.draw.rect(layer, (0, 0, 0), KEYPAD_RECT, 0)
+    pygame.draw.rect(layer, (0, 0, 0), KEYPAD_RECT, 3)
+    small_box_w, small_box_h = 12, 16
+    small_start_x = KEYPAD_RECT.x + 3
+    for i in range(4):
+        box_x = small_start_x + i * (small_box_w + 2)
+        pygame.draw.rect(layer, (40, 40, 40), (box_x, KEYPAD_RECT.y + 10, small_box_w, small_box_h), 0)
+        pygame.draw.rect(layer, (200, 200, 200), (box_x, KEYPAD_RECT.y + 10, small_box_w, small_box_h), 1)
     
-    # Inventory
-    else:
-        if hammer_taken and INVENTORY_SLOT_RECT.collidepoint(pos):
-            stop_foreground_sounds()
-            if selected_item == "hammer":
-                selected_item = None
-                set_message("Deselected hammer.", 60)
-            else:
-                selected_item = "hammer"
-                set_message("Selected hammer. 🔨", 60)
-
-# --- MAIN LOOP --------------------------------------------------------------
-running = True
-mouse_pos = (0, 0)
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            DOOR_KNOCK_SOUND.stop()
-            HORROR_SOUND.stop()
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            handle_click(event.pos)
-        elif event.type == pygame.KEYDOWN:
-            handle_otp_keydown(event)
+    # TV PIN PANEL
+    if tv_on:
+        layer.blit(tv_pin_img, RIGHT_DOOR_TV_RECT.topleft)
     
-    mouse_pos = pygame.mouse.get_pos()
-    restart_hover = RESTART_RECT.collidepoint(mouse_pos)
-    if restart_hover:
-        tooltip_timer += 1
-    else:
-        tooltip_timer = 0
+    # GLASS CASE
+    if not glass_intact:
+        layer.blit(switch_img, GLASS_CASE_RECT.topleft)
     
-    OTP_CURSOR_BLINK += 1
+    # LEFT DOOR IMAGE
+    if left_door_open:
+        layer.blit(left_door_img, LEFT_DOOR_RECT.topleft)
     
-    # --- WIN CONDITION: 2 seconds after left door opened ---
-    if left_door_unlocked_visual and left_door_opened_time > 0:
-        time_elapsed = (pygame.time.get_ticks() - left_door_opened_time) / 1000
-        if time_elapsed >= 2.0 and not game_won:
-            game_won = True
-            win_timer = pygame.time.get_ticks()
+    # RIGHT DOOR IMAGE (NEW)
+    if right_door_open:
+        layer.blit(right_door_img, RIGHT_DOOR_RECT.topleft)
     
-    # --- DRAWING - GAME WON FIRST ---------------------------------------------
-    if game_won:
-        screen.blit(over_img, (0, 0))
+    # Drawer + hammer
+    if drawer_is_open:
+        layer.blit(DRAWER_OPEN_IMG, DRAWER_RECT.topleft)
+        if not hammer_gone:
+            layer.blit(HAMMER_IMG, HAMMER_RECT.topleft)
+    return layer
+
+def track_regions(message_visible):
+    if game.game_won:
+        renderer.track("screen", renderer.screen_rect, "WON")
+    elif not game.room_power_on:
+        renderer.track("screen", renderer.screen_rect, "DARK")
+        renderer.track("return_button", RETURN_BUTTON_RECT, RETURN_BUTTON_RECT.collidepoint(mouse_pos))
+    else:
+        renderer.track("screen", renderer.screen_rect, "ROOM")
+        renderer.track("restart", RESTART_ICON_RECT, restart_draw_angle())
+        renderer.track("tooltip", TOOLTIP_RECT, tooltip_shown())
+        renderer.track("keypad", KEYPAD_RECT, tuple(game.otp_digits))
+        renderer.track("tv", (RIGHT_DOOR_TV_RECT.topleft, tv_pin_img.get_size()), game.tv_state in ("IMAGE", "PIN", "UNLOCKED"))
+        renderer.track("tv_video", (RIGHT_DOOR_TV_RECT.topleft, tv_pin_img.get_size()), tv_frame)
+        renderer.track("glass", (GLASS_CASE_RECT.topleft, switch_img.get_size()), game.glass_case_intact)
+        renderer.track("left_door", (LEFT_DOOR_RECT.topleft, left_door_img.get_size()), game.left_door_unlocked_visual)
+        renderer.track("right_door", RIGHT_DOOR_RECT, game.right_door_unlocked)
+        renderer.track("drawer", DRAWER_RECT, (game.drawer_open, game.hammer_taken))
+        renderer.track("inventory", INVENTORY_PANEL_RECT, (game.hammer_taken, game.selected_item))
+        renderer.track("keypad_panel", get_keypad_panel_rect(), game.keypad_active and (tuple(game.otp_digits), cursor_on()))
+    renderer.track("message", MESSAGE_RECT, message_visible and message)
+    if scene_stack:
+        scene = scene_stack[-1][0]
+        renderer.track("scene", scene.rect, scene.state_key())
+    else:
+        renderer.track("scene", SUDOKU_RECT, None)
+    renderer.track("profiler", PROFILER_RECT, PROFILER.enabled and tuple(profiler_lines))
+
+def restart_draw_angle():
+    return int(restart_prev_angle + (restart_angle - restart_prev_angle) * render_alpha)
+
+def tooltip_shown():
+    return restart_hover and hover_since is not None and sim_time - hover_since >= TOOLTIP_DELAY_MS
+
+def cursor_on():
+    return (sim_time - otp_blink_since) % (2 * BLINK_MS) < BLINK_MS
+
+def draw_restart_icon():
+    RESTART_ICON.draw(screen, RESTART_RECT.center, restart_draw_angle())
+
+def draw_frame(message_visible):
+    if game.game_won:
+        screen.blit(ASSETS.get("over"), (0, 0))
         # Restart button still works
-        cx, cy = RESTART_RECT.center
-        radius_outer = 16
-        thickness = 4
-        start_angle = math.radians(60)
-        end_angle = math.radians(330)
-        arc_rect = pygame.Rect(cx - radius_outer, cy - radius_outer, radius_outer * 2, radius_outer * 2)
-        pygame.draw.arc(screen, (255, 255, 255), arc_rect, start_angle, end_angle, thickness)
-        head_angle = math.radians(60)
-        tip_x = cx + radius_outer * math.cos(head_angle)
-        tip_y = cy + radius_outer * math.sin(head_angle)
-        arrow_len = 10
-        dir_angle = head_angle - math.radians(30)
-        ax = arrow_len * math.cos(dir_angle)
-        ay = arrow_len * math.sin(dir_angle)
-        arrow_points = [(tip_x, tip_y), (tip_x - ax - ay/3, tip_y - ay + ax/3), (tip_x - ax + ay/3, tip_y - ay - ax/3)]
-        pygame.draw.polygon(screen, (255, 255, 255), arrow_points)
-    elif not room_power_on:
-        screen.blit(pin_img, (0, 0))
+        draw_restart_icon()
+    elif not game.room_power_on:
+        screen.blit(ASSETS.get("pin"), (0, 0))
+        if CORRECT_CODE != PIN_ART_CODE:
+            # Seeded room: paint the drawn code over the printed one
+            pygame.draw.rect(screen, (0, 0, 0), PIN_ART_CODE_RECT, 0)
+            code_text = render_text(FONT_CODE, CORRECT_CODE, True, (200, 200, 200))
+            screen.blit(code_text, code_text.get_rect(center=PIN_ART_CODE_RECT.center))
         pygame.draw.rect(screen, (0, 0, 0), RETURN_BUTTON_RECT, 0)
         pygame.draw.rect(screen, (200, 200, 200), RETURN_BUTTON_RECT, 3)
-        return_text = FONT_SMALL.render("LIGHTS", True, (255, 255, 255))
+        return_text = render_text(FONT_SMALL, "LIGHTS", True, (255, 255, 255))
         screen.blit(return_text, (RETURN_BUTTON_RECT.x + 5, RETURN_BUTTON_RECT.y + 10))
         if RETURN_BUTTON_RECT.collidepoint(mouse_pos):
             pygame.draw.rect(screen, (50, 50, 50), RETURN_BUTTON_RECT, 0)
     else:
         # NORMAL ROOM DRAWING (your existing code)
-        screen.fill((0, 0, 0))
-        screen.blit(room_bg, (0, 0))
-        
-        if door_just_touched:
-            door_just_touched = False
+        screen.blit(room_layers.get(get_room_layer_key()), (0, 0))
+        if tv_frame is not None:
+            screen.blit(tv_frame, RIGHT_DOOR_TV_RECT.topleft)
         
         # Restart button (unchanged)
-        cx, cy = RESTART_RECT.center
-        radius_outer = 16
-        thickness = 4
-        
-        if restart_rotating:
-            restart_angle += 20
-            restart_frames += 1
-            if restart_frames > 36:
-                restart_rotating = False
-                restart_angle = 0
-        
-        start_angle = math.radians(60 + restart_angle)
-        end_angle = math.radians(330 + restart_angle)
-        arc_rect = pygame.Rect(cx - radius_outer, cy - radius_outer, radius_outer * 2, radius_outer * 2)
-        pygame.draw.arc(screen, (255, 255, 255), arc_rect, start_angle, end_angle, thickness)
-        
-        head_angle = math.radians(60 + restart_angle)
-        tip_x = cx + radius_outer * math.cos(head_angle)
-        tip_y = cy + radius_outer * math.sin(head_angle)
-        arrow_len = 10
-        dir_angle = head_angle - math.radians(30)
-        ax = arrow_len * math.cos(dir_angle)
-        ay = arrow_len * math.sin(dir_angle)
-        arrow_points = [(tip_x, tip_y), (tip_x - ax - ay/3, tip_y - ay + ax/3), (tip_x - ax + ay/3, tip_y - ay - ax/3)]
-        pygame.draw.polygon(screen, (255, 255, 255), arrow_points)
-        
-        if restart_hover and tooltip_timer > 30:
-            tooltip_rect = pygame.Rect(55, 10, 150, 30)
-            pygame.draw.rect(screen, (0, 0, 0), tooltip_rect, 0)
-            pygame.draw.rect(screen, (255, 255, 255), tooltip_rect, 2)
-            screen.blit(FONT_SMALL.render("Restart Game", True, (255, 255, 255)), (60, 15))
-        
-        # DEBUG OUTLINES
-        # pygame.draw.rect(screen, (255, 0, 0), DRAWER_RECT, 2)
-        # pygame.draw.rect(screen, (0, 255, 0), LEFT_DOOR_RECT, 2)
-        # pygame.draw.rect(screen, (255, 128, 255), GLASS_CASE_RECT, 3)
-        # pygame.draw.rect(screen, (0, 0, 255), RIGHT_DOOR_RECT, 2)
-        # pygame.draw.rect(screen, (255, 255, 0), KEYPAD_RECT, 3)
-        # pygame.draw.rect(screen, (0, 255, 255), MIDDLE_RECT, 2)
-        # pygame.draw.rect(screen, (255, 0, 255), RIGHT_DOOR_TV_RECT, 2)
+        draw_restart_icon()
         
-        # SMALL KEYPAD (unchanged)
-        pygame.draw.rect(screen, (0, 0, 0), KEYPAD_RECT, 0)
-        pygame.draw.rect(screen, (0, 0, 0), KEYPAD_RECT, 3)
-        small_box_w, small_box_h = 12, 16
-        small_start_x = KEYPAD_RECT.x + 3
-        for i in range(4):
-            box_x = small_start_x + i * (small_box_w + 2)
-            pygame.draw.rect(screen, (40, 40, 40), (box_x, KEYPAD_RECT.y + 10, small_box_w, small_box_h), 0)
-            pygame.draw.rect(screen, (200, 200, 200), (box_x, KEYPAD_RECT.y + 10, small_box_w, small_box_h), 1)
-            if otp_digits[i]:
-                digit_surf = FONT_TINY.render(otp_digits[i], True, (255, 255, 255))
-                screen.blit(digit_surf, (box_x + 3, KEYPAD_RECT.y + 12))
+        if tooltip_shown():
+            pygame.draw.rect(screen, (0, 0, 0), TOOLTIP_RECT, 0)
+            pygame.draw.rect(screen, (255, 255, 255), TOOLTIP_RECT, 2)
+            screen.blit(render_text(FONT_SMALL, "Restart Game", True, (255, 255, 255)), (60, 15))
         
-        # TV PIN PANEL
-        if tv_state in ("IMAGE", "PIN", "UNLOCKED"):
-            screen.blit(tv_pin_img, RIGHT_DOOR_TV_RECT.topleft)
-        
-        # GLASS CASE
-        if glass_case_intact:
-            pass
-        else:
-            screen.blit(switch_img, GLASS_CASE_RECT.topleft)
-        
-        # LEFT DOOR IMAGE
-        if left_door_unlocked_visual:
-            screen.blit(left_door_img, LEFT_DOOR_RECT.topleft)
-        
-        # RIGHT DOOR IMAGE (NEW)
-        if right_door_unlocked:
-            screen.blit(right_door_img, RIGHT_DOOR_RECT.topleft)
-        
-        # Drawer + hammer
-        if drawer_open:
-            screen.blit(DRAWER_OPEN_IMG, DRAWER_RECT.topleft)
-            if not hammer_taken:
-                screen.blit(HAMMER_IMG, HAMMER_RECT.topleft)
+        # SMALL KEYPAD digits (the open left door image covers the keypad)
+        if not game.left_door_unlocked_visual:
+            small_box_w = 12
+            small_start_x = KEYPAD_RECT.x + 3
+            for i in range(4):
+                box_x = small_start_x + i * (small_box_w + 2)
+                if game.otp_digits[i]:
+                    digit_surf = render_text(FONT_TINY, game.otp_digits[i], True, (255, 255, 255))
+                    screen.blit(digit_surf, (box_x + 3, KEYPAD_RECT.y + 12))
         
         # Inventory (unchanged)
-        pygame.draw.rect(screen, (20, 20, 20), (ROOM_WIDTH, 0, INVENTORY_WIDTH, SCREEN_HEIGHT), 0)
-        screen.blit(FONT.render("Inventory", True, (255, 255, 255)), (ROOM_WIDTH + 40, 30))
+        pygame.draw.rect(screen, (20, 20, 20), INVENTORY_PANEL_RECT, 0)
+        screen.blit(render_text(FONT, "Inventory", True, (255, 255, 255)), (ROOM_WIDTH + 40, 30))
         
-        border_color = (255, 255, 0) if selected_item == "hammer" else (100, 100, 100)
-        border_width = 4 if selected_item == "hammer" else 2
+        border_color = (255, 255, 0) if game.selected_item == "hammer" else (100, 100, 100)
+        border_width = 4 if game.selected_item == "hammer" else 2
         pygame.draw.rect(screen, border_color, INVENTORY_SLOT_RECT, border_width)
         
-        if hammer_taken:
-            inv_hammer = pygame.transform.scale(HAMMER_IMG, (INVENTORY_SLOT_RECT.width - 20, INVENTORY_SLOT_RECT.height - 20))
-            screen.blit(inv_hammer, INVENTORY_SLOT_RECT.inflate(-20, -20).topleft)
+        if game.hammer_taken:
+            screen.blit(INV_HAMMER_IMG, INVENTORY_SLOT_RECT.inflate(-20, -20).topleft)
         
-        if selected_item:
-            screen.blit(FONT_SMALL.render(f"Selected: {selected_item}", True, (255, 255, 0)), (ROOM_WIDTH + 20, 170))
+        if game.selected_item:
+            screen.blit(render_text(FONT_SMALL, f"Selected: {game.selected_item}", True, (255, 255, 0)), (ROOM_WIDTH + 20, 170))
         
         # Zoomed keypad (unchanged)
-        if keypad_active:
-            panel_width, panel_height = 400, 160
-            panel_rect = pygame.Rect((ROOM_WIDTH - panel_width) // 2, ROOM_HEIGHT - panel_height - 40, panel_width, panel_height)
+        if game.keypad_active:
+            panel_rect = get_keypad_panel_rect()
+            panel_width = panel_rect.width
             pygame.draw.rect(screen, (10, 10, 10), panel_rect, 0)
             pygame.draw.rect(screen, (200, 200, 200), panel_rect, 3)
-            screen.blit(FONT.render("Enter 4-digit code:", True, (255, 255, 255)), (panel_rect.x + 20, panel_rect.y + 10))
+            screen.blit(render_text(FONT, "Enter 4-digit code:", True, (255, 255, 255)), (panel_rect.x + 20, panel_rect.y + 10))
             
             back_rect = pygame.Rect(panel_rect.x + panel_width - 40, panel_rect.y + 10, 30, 30)
             pygame.draw.rect(screen, (200, 50, 50), back_rect, 0)
             pygame.draw.rect(screen, (255, 255, 255), back_rect, 2)
-            screen.blit(FONT.render("✕", True, (255, 255, 255)), (back_rect.x + 8, back_rect.y + 5))
+            screen.blit(render_text(FONT, "✕", True, (255, 255, 255)), (back_rect.x + 8, back_rect.y + 5))
             
             box_width, box_height = 65, 75
             start_x = panel_rect.x + 40
             for i in range(4):
                 box_x = start_x + i * (box_width + 20)
                 box_rect = pygame.Rect(box_x, panel_rect.y + 35, box_width, box_height)
-                current_box = i == next((j for j, d in enumerate(otp_digits) if d == ""), 3)
+                current_box = i == next((j for j, d in enumerate(game.otp_digits) if d == ""), 3)
                 color = (0, 200, 255) if current_box else (50, 50, 50)
                 pygame.draw.rect(screen, color, box_rect, 0)
                 pygame.draw.rect(screen, (255, 255, 255), box_rect, 3)
-                if otp_digits[i]:
-                    screen.blit(FONT_OTP.render(otp_digits[i], True, (255, 255, 255)), (box_x + 18, panel_rect.y + 38))
-                elif current_box and (OTP_CURSOR_BLINK % 40 < 20):
-                    screen.blit(FONT_OTP.render("|", True, (0, 200, 255)), (box_x + 25, panel_rect.y + 38))
+                if game.otp_digits[i]:
+                    screen.blit(render_text(FONT_OTP, game.otp_digits[i], True, (255, 255, 255)), (box_x + 18, panel_rect.y + 38))
+                elif current_box and cursor_on():
+                    screen.blit(render_text(FONT_OTP, "|", True, (0, 200, 255)), (box_x + 25, panel_rect.y + 38))
     
     # Messages
-    if message and message_timer > 0 and room_power_on and not game_won:
-        screen.blit(FONT.render(message, True, (255, 255, 255)), (40, SCREEN_HEIGHT - 50))
-        message_timer -= 1
+    if message_visible:
+        screen.blit(render_text(FONT, message, True, (255, 255, 255)), (40, SCREEN_HEIGHT - 50))
+    
+    # Overlay scenes (sudoku) on top of everything
+    for scene, _ in scene_stack:
+        scene.draw(screen)
     
-    pygame.display.flip()
-    clock.tick(60)
+    if PROFILER.enabled:
+        pygame.draw.rect(screen, (0, 0, 0), PROFILER_RECT, 0)
+        for i, line in enumerate(profiler_lines):
+            screen.blit(render_text(FONT_TINY, line, True, (0, 255, 0)), (PROFILER_RECT.x + 8, PROFILER_RECT.y + 8 + i * 18))
 
-pygame.quit()
+# --- MAIN LOOP --------------------------------------------------------------
+mouse_pos = (0, 0)
+renderer = None
+room_layers = LayerCache(build_room_layer, maxsize=4)  # one composite per overlay combination
+PROFILER = FrameProfiler(("events", "logic", "draw", "present", "wait"), enabled=PROFILE)
+profiler_lines = PROFILER.summary()
+profiler_refresh_at = 0  # ticks when the overlay text is next recomputed
+SCHEDULER = None
+
+def update_step():
+    # One fixed logic step of STEP_MS
+    global sim_time, message_until, restart_rotating, restart_angle, restart_prev_angle
+    sim_time += STEP_MS
+    if message and not (game.room_power_on and not game.game_won):
+        message_until += STEP_MS  # hidden messages keep their time left
+    restart_prev_angle = restart_angle
+    if restart_rotating:
+        elapsed = sim_time - restart_spin_start
+        if elapsed >= SPIN_MS:
+            restart_rotating = False
+            restart_angle = restart_prev_angle = 0
+        else:
+            restart_angle = elapsed * SPIN_DEG_PER_MS
+    # Delayed room events (the win, 2 seconds after the left door opens)
+    ENGINE.update()
+
+def init():
+    # Everything the main loop needs: window, assets, sounds, music
+    global renderer, SCHEDULER, last_ticks
+    report_startup("imports")
+    open_window()
+    queue_assets()
+    load_room_rects()
+    start_engine()
+    build_hotspots()
+    load_fonts()
+    pick_code()
+    wait_for_assets()
+    load_sounds()
+    scale_sprites()
+    play_music(0.3)  # horror.mp3, streamed
+    renderer = DirtyRectRenderer(screen, enabled=DIRTY_RECTS)
+    SCHEDULER = FrameScheduler(clock, fps=RENDER_FPS, idle=IDLE)
+    last_ticks = pygame.time.get_ticks()
+
+def shutdown():
+    if PROFILE_OUT:
+        PROFILER.export(PROFILE_OUT)
+    if MINIGAME_HOST:
+        MINIGAME_HOST.shutdown()
+    if TV_PLAYER:
+        TV_PLAYER.close()
+    pygame.quit()
+
+def run():
+    global mouse_pos, restart_hover, hover_since, accumulator, last_ticks, render_alpha
+    global profiler_lines, profiler_refresh_at, tv_frame
+    init()
+    running = True
+    startup_pending = True
+    while running:
+        PROFILER.frame()
+        for event in SCHEDULER.events():
+            if event.type == pygame.QUIT:
+                AUDIO.stop_all()
+                running = False
+            elif scene_stack:
+                scene_stack[-1][0].handle_event(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                handle_click(event.pos)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                PROFILER.toggle()
+            elif DEBUG_UNDO and event.type == pygame.KEYDOWN and event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+                undo()
+            elif event.type == pygame.KEYDOWN:
+                handle_otp_keydown(event)
+        PROFILER.lap()
+    
+        mouse_pos = pygame.mouse.get_pos()
+        hovered = HOTSPOTS.hit(mouse_pos)
+        restart_hover = hovered is not None and hovered.name == "restart"
+        if not restart_hover:
+            hover_since = None
+        elif hover_since is None:
+            hover_since = sim_time
+    
+        # Fixed-step logic: a step per STEP_MS of real time, whatever the frame rate
+        now = pygame.time.get_ticks()
+        accumulator = min(accumulator + now - last_ticks, MAX_CATCH_UP_MS)
+        last_ticks = now
+        while accumulator >= STEP_MS:
+            update_step()
+            accumulator -= STEP_MS
+        render_alpha = accumulator / STEP_MS
+    
+        update_scenes()
+    
+        # Overlay text changes twice a second so it stays readable and cheap
+        if PROFILER.enabled and now >= profiler_refresh_at:
+            profiler_lines = PROFILER.summary()
+            profiler_refresh_at = now + 500
+        PROFILER.lap()
+    
+        # --- DRAWING (only the regions that changed) ---
+        room_visible = game.room_power_on and not game.game_won
+        message_visible = bool(message) and sim_time < message_until and room_visible
+        # The video runs while the TV shows its picture and pauses on any other state
+        if TV_PLAYER:
+            if room_visible and game.tv_state == "IMAGE":
+                TV_PLAYER.play()
+                tv_frame = TV_PLAYER.frame()
+            else:
+                TV_PLAYER.pause()
+                tv_frame = None
+        track_regions(message_visible)
+        if renderer.begin():
+            draw_frame(message_visible)
+        PROFILER.lap()
+        renderer.present()
+        PROFILER.lap()
+        if startup_pending:
+            if startup_first_frame:
+                report_startup("first_frame")
+            report_startup("interactive")
+            startup_pending = False
+            if STARTUP_REPORT == "exit":
+                running = False
+        if not running:
+            break  # no sleeping on the way out
+    
+        # Full rate only while something moves; otherwise sleep until input or
+        # the next deadline
+        SCHEDULER.animate((room_visible and restart_rotating)
+                          or (TV_PLAYER is not None and TV_PLAYER.playing))
+        if message_visible:
+            SCHEDULER.wake_at(to_ticks(message_until))
+        if restart_hover and not tooltip_shown():
+            SCHEDULER.wake_at(to_ticks(hover_since + TOOLTIP_DELAY_MS))
+        if room_visible and game.keypad_active:
+            SCHEDULER.wake_at(to_ticks(sim_time + BLINK_MS - (sim_time - otp_blink_since) % BLINK_MS))
+        if ENGINE.timers:
+            SCHEDULER.wake_at(to_ticks(min(ENGINE.timers.values())))
+        if scene_stack:
+            SCHEDULER.wake_at(scene_stack[-1][0].deadline())
+        if minigame_sessions:
+            SCHEDULER.wake_at(pygame.time.get_ticks() + 100)  # poll the worker
+        SCHEDULER.wait()
+        PROFILER.lap()
+    shutdown()
+
+if __name__ == "__main__":
+    run()
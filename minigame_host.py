@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import queue
+import itertools
+import threading
+import subprocess
+
+# --- MINIGAME HOST ----------------------------------------------------------
+# Keeps worker processes warm (interpreter started, pygame and the minigame
+# modules imported) so a minigame that has to run isolated starts in
+# milliseconds instead of a fresh "python sudoku.py". Requests and results are
+# JSON lines over the worker's stdin/stdout:
+#
+#   host -> worker  {"session": 3, "game": "sudoku"}
+#   worker -> host  {"event": "ready"}
+#                   {"event": "result", "session": 3, "solved": true,
+#                    "time_ms": 5120, "moves": 6, "errors": 1}
+#
+# A session that outlives its timeout (or is cancelled) kills its worker;
+# a fresh one is started in its place, so a hung child never blocks the room.
+GAMES = {"sudoku": "sudoku"}  # game name -> module with a play() -> dict
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class _Worker:
+    def __init__(self, results):
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        self.proc = subprocess.Popen([sys.executable, "-u", os.path.join(ROOT, "minigame_host.py"), "--worker"],
+                                     cwd=os.getcwd(), env=env, stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, text=True, bufsize=1)
+        self.ready = False
+        self.session = None
+        self.deadline = None
+        self._results = results
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            self._results.put((self, message))
+        self._results.put((self, {"event": "exit"}))
+
+    def send(self, message):
+        self.proc.stdin.write(json.dumps(message) + "\n")
+        self.proc.stdin.flush()
+
+    def kill(self):
+        self.proc.kill()
+
+
+class MinigameHost:
+    def __init__(self, workers=1, timeout=None):
+        self.size = workers
+        self.timeout = timeout
+        self._results = queue.Queue()
+        self._workers = []
+        self._waiting = []  # sessions queued while every worker is busy
+        self._ids = itertools.count(1)
+
+    def start(self):
+        while len(self._workers) < self.size:
+            self._workers.append(_Worker(self._results))
+
+    def launch(self, game, timeout=None):
+        if game not in GAMES:
+            raise ValueError(f"unknown minigame: {game}")
+        session = next(self._ids)
+        self._waiting.append((session, game, timeout if timeout is not None else self.timeout))
+        self._dispatch()
+        return session
+
+    def _dispatch(self):
+        while self._waiting:
+            worker = next((w for w in self._workers if w.ready and w.session is None), None)
+            if worker is None:
+                return
+            session, game, timeout = self._waiting.pop(0)
+            worker.session = session
+            worker.deadline = time.monotonic() + timeout if timeout else None
+            worker.send({"session": session, "game": game})
+
+    def _replace(self, worker):
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        self._workers.append(_Worker(self._results))
+
+    def cancel(self, session, reason="cancelled"):
+        for i, (queued, game, _) in enumerate(self._waiting):
+            if queued == session:
+                del self._waiting[i]
+                return {"event": "result", "session": session, "solved": False, "cancelled": reason}
+        for worker in self._workers:
+            if worker.session == session:
+                self._replace(worker)
+                return {"event": "result", "session": session, "solved": False, "cancelled": reason}
+        return None
+
+    def poll(self):
+        # Non-blocking: returns the results that arrived since the last call.
+        finished = []
+        while True:
+            try:
+                worker, message = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if worker not in self._workers:
+                continue  # output from a worker we already killed
+            event = message.get("event")
+            if event == "ready":
+                worker.ready = True
+            elif event == "result" and message.get("session") == worker.session:
+                worker.session = None
+                worker.deadline = None
+                finished.append(message)
+            elif event == "exit":
+                if worker.session is not None:
+                    finished.append({"event": "result", "session": worker.session,
+                                     "solved": False, "cancelled": "worker exited"})
+                self._replace(worker)
+
+        now = time.monotonic()
+        for worker in list(self._workers):
+            if worker.deadline is not None and now >= worker.deadline:
+                finished.append(self.cancel(worker.session, "timeout"))
+        self._dispatch()
+        return finished
+
+    def busy(self):
+        return bool(self._waiting) or any(w.session is not None for w in self._workers)
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.kill()
+        self._workers = []
+        self._waiting = []
+
+
+# --- WORKER -----------------------------------------------------------------
+def worker_main():
+    # stdout is the result pipe; anything else printed goes to stderr.
+    channel = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    import importlib
+    import pygame
+    modules = {name: importlib.import_module(module) for name, module in GAMES.items()}
+    pygame.font.init()
+    for module in modules.values():
+        getattr(module, "load_fonts", lambda: None)()
+    channel.write(json.dumps({"event": "ready"}) + "\n")
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        result = modules[request["game"]].play()
+        pygame.display.quit()
+        result.update(event="result", session=request["session"])
+        channel.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--worker"]:
+        worker_main()
@@ -0,0 +1,143 @@
+import time
+from array import array
+
+# --- FRAME PROFILER ---------------------------------------------------------
+# Per-phase frame timings in a ring buffer allocated up front. Call frame()
+# at the top of the loop and lap() at the end of each phase, in the order the
+# phases were named; lap() charges the time since the previous mark to the
+# next phase. While disabled both are a bound no-op, so an instrumented loop
+# costs a few empty calls per frame.
+#
+#   PROFILER = FrameProfiler(("events", "logic", "draw", "present", "wait"))
+#   while running:
+#       PROFILER.frame()
+#       ...; PROFILER.lap()   # events
+#       ...; PROFILER.lap()   # logic ...
+
+
+def _nothing():
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, phases, frames=600, enabled=False, idle=("wait",), clock=time.perf_counter):
+        self.phases = tuple(phases)
+        self.idle = idle  # phases never reported as the worst (frame pacing)
+        self.capacity = frames
+        self.clock = clock
+        slots = frames + 1  # the frames kept + the one being recorded
+        self._starts = array("d", bytes(8 * slots))  # frame start, seconds
+        self._times = array("d", bytes(8 * slots * len(self.phases)))  # ms per phase
+        self._count = 0  # complete frames recorded, ever
+        self._open = False  # a frame is being recorded in slot _count % slots
+        self._row = 0  # its offset in _times
+        self._phase = 0
+        self._mark = 0.0
+        self.enabled = False
+        self.enable(enabled)
+
+    def enable(self, on=True):
+        self.enabled = on
+        self._open = False  # a frame cut short is dropped
+        if on:
+            self.frame = self._frame
+            self.lap = self._lap
+        else:
+            self.frame = self.lap = _nothing
+
+    def toggle(self):
+        self.enable(not self.enabled)
+
+    def clear(self):
+        self._count = 0
+        self._open = False
+
+    def _frame(self):
+        now = self.clock()
+        if self._open:
+            self._count += 1
+        slot = self._count % (self.capacity + 1)
+        self._starts[slot] = now
+        self._row = slot * len(self.phases)
+        self._phase = 0
+        self._mark = now
+        self._open = True
+
+    def _lap(self):
+        now = self.clock()
+        if self._open and self._phase < len(self.phases):
+            self._times[self._row + self._phase] = (now - self._mark) * 1000
+            self._phase += 1
+        self._mark = now
+
+    # --- RESULTS ---
+    def rows(self):
+        # Complete frames, oldest first: (start seconds, [ms per phase])
+        count = len(self.phases)
+        total = min(self._count, self.capacity)
+        for i in range(self._count - total, self._count):
+            slot = i % (self.capacity + 1)
+            yield self._starts[slot], self._times[slot * count:(slot + 1) * count]
+
+    def stats(self):
+        # Frame time percentiles and the busy phase with the highest mean, in ms
+        frames = []
+        sums = [0.0] * len(self.phases)
+        for _, times in self.rows():
+            frames.append(sum(times))
+            for i, ms in enumerate(times):
+                sums[i] += ms
+        if not frames:
+            return None
+        frames.sort()
+        n = len(frames)
+        worst = max((i for i, phase in enumerate(self.phases) if phase not in self.idle),
+                    key=sums.__getitem__, default=0)
+        return {
+            "frames": n,
+            "p50": frames[(n - 1) * 50 // 100],
+            "p95": frames[(n - 1) * 95 // 100],
+            "p99": frames[(n - 1) * 99 // 100],
+            "max": frames[-1],
+            "worst_phase": self.phases[worst],
+            "worst_phase_ms": sums[worst] / n,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        if stats is None:
+            return ["no frames recorded"]
+        return [f"frame p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f} ms",
+                f"worst: {stats['worst_phase']} {stats['worst_phase_ms']:.1f} ms avg ({stats['frames']} frames)"]
+
+    # --- EXPORT ---
+    def export(self, path):
+        # Chrome trace (chrome://tracing, Perfetto) for .json, else CSV
+        if path.endswith(".json"):
+            self.export_trace(path)
+        else:
+            self.export_csv(path)
+
+    def export_trace(self, path):
+        import json
+        import socket
+        host = socket.gethostname()
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": host}}]
+        for frame, (start, times) in enumerate(self.rows()):
+            ts = start * 1e6
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": ts,
+                           "dur": sum(times) * 1000, "args": {"frame": frame}})
+            for phase, ms in zip(self.phases, times):
+                events.append({"name": phase, "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": ms * 1000})
+                ts += ms * 1000
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"host": host, "stats": self.stats()}}, f)
+
+    def export_csv(self, path):
+        import csv
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame", "start_s", "total_ms") + self.phases)
+            for frame, (start, times) in enumerate(self.rows()):
+                writer.writerow([frame, f"{start:.6f}", f"{sum(times):.3f}"] + [f"{ms:.3f}" for ms in times])
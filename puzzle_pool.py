@@ -0,0 +1,203 @@
+import os
+import sys
+import mmap
+import random
+import struct
+
+from sudoku_gen import DIFFICULTY, generate
+
+# --- PUZZLE POOLS -----------------------------------------------------------
+# Puzzles and room codes are generated offline into fixed-size binary records
+# and memory-mapped at runtime, so picking one is a seek, not a search.
+#
+#   python puzzle_pool.py sudoku 4 --holes 5 --count 100000   # all cores
+#   python puzzle_pool.py sudoku 9 --difficulty hard --count 20000
+#   python puzzle_pool.py codes --count 10000
+#
+# Sudoku record: the solution as one nibble per cell (digit - 1, so 16x16
+# fits too), then one bit per cell marking the holes. 4x4 = 10 bytes,
+# 9x9 = 52 bytes. Code record: 4 decimal digits, two per byte.
+#
+# The game and every sudoku worker import this module just to read pools, so
+# the builders import the process pool and argparse only when they run.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+POOL_DIR = os.path.join(ROOT, "assets", "puzzles")
+SUDOKU_MAGIC = b"MRP2"
+# magic, size, holes, record size, count; holes is 16 bits (16x16 = 256 cells)
+SUDOKU_HEADER = struct.Struct("<4sBHHI")
+CODES_MAGIC = b"MRC1"
+CODES_HEADER = struct.Struct("<4sBBHI")   # magic, digits, unused, record size, count
+CHUNK = 256  # records per worker task
+
+
+def sudoku_pool_path(n, holes):
+    return os.path.join(POOL_DIR, f"sudoku{n}_h{holes}.pool")
+
+
+def codes_pool_path(digits=4):
+    return os.path.join(POOL_DIR, f"codes{digits}.pool")
+
+
+# --- RECORDS ----------------------------------------------------------------
+def pack_sudoku(puzzle, solution):
+    cells = [v - 1 for row in solution for v in row]
+    if len(cells) % 2:
+        cells.append(0)
+    nibbles = bytes(cells[i] | cells[i + 1] << 4 for i in range(0, len(cells), 2))
+    holes = 0
+    for i, v in enumerate(v for row in puzzle for v in row):
+        if not v:
+            holes |= 1 << i
+    return nibbles + holes.to_bytes((len(solution) ** 2 + 7) // 8, "little")
+
+
+def unpack_sudoku(record, n):
+    size = n * n
+    half = (size + 1) // 2
+    cells = []
+    for byte in record[:half]:
+        cells.append((byte & 15) + 1)
+        cells.append((byte >> 4) + 1)
+    holes = int.from_bytes(record[half:], "little")
+    solution = [cells[r * n:(r + 1) * n] for r in range(n)]
+    puzzle = [[0 if holes >> (r * n + c) & 1 else solution[r][c] for c in range(n)] for r in range(n)]
+    return puzzle, solution
+
+
+def pack_code(code):
+    digits = [int(d) for d in code] + [0] * (len(code) % 2)
+    return bytes(digits[i] << 4 | digits[i + 1] for i in range(0, len(digits), 2))
+
+
+def unpack_code(record, digits):
+    return "".join(f"{byte:02x}" for byte in record)[:digits]
+
+
+# --- READING ----------------------------------------------------------------
+class _RecordFile:
+    # A memory-mapped pool: header, then `count` records of equal size.
+
+    def __init__(self, path, magic, header):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        found, self.param, self.holes, self.record_size, self.count = header.unpack_from(self._map)
+        if found != magic or len(self._map) < header.size + self.record_size * self.count:
+            self._map.close()
+            raise ValueError(f"not a valid pool file: {path}")
+        self._offset = header.size
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        start = self._offset + index * self.record_size
+        return self._map[start:start + self.record_size]
+
+    def records(self):
+        # Every record back to back, without copying (for batch readers)
+        return memoryview(self._map)[self._offset:self._offset + self.record_size * self.count]
+
+    def close(self):
+        self._map.close()
+
+
+class SudokuPool(_RecordFile):
+    def __init__(self, path):
+        super().__init__(path, SUDOKU_MAGIC, SUDOKU_HEADER)
+        self.size = self.param
+
+    def __getitem__(self, index):
+        return unpack_sudoku(self.record(index), self.size)
+
+    def pick(self, rng=random):
+        # (puzzle, solution), in O(1)
+        return self[rng.randrange(self.count)]
+
+
+class CodePool(_RecordFile):
+    def __init__(self, path):
+        super().__init__(path, CODES_MAGIC, CODES_HEADER)
+        self.digits = self.param
+
+    def __getitem__(self, index):
+        return unpack_code(self.record(index), self.digits)
+
+    def pick(self, rng=random):
+        return self[rng.randrange(self.count)]
+
+
+def open_pool(path, kind=SudokuPool):
+    # None when the pool has not been built (callers generate on the fly).
+    try:
+        return kind(path)
+    except (OSError, ValueError):
+        return None
+
+
+# --- BUILDING ---------------------------------------------------------------
+def _sudoku_chunk(args):
+    n, holes, seed, count = args
+    rng = random.Random(seed)
+    return b"".join(pack_sudoku(*generate(n, holes=holes, rng=rng)) for _ in range(count))
+
+
+def _codes_chunk(args):
+    digits, seed, count = args
+    rng = random.Random(seed)
+    return b"".join(pack_code("".join(rng.choice("0123456789") for _ in range(digits)))
+                    for _ in range(count))
+
+
+def _write_pool(path, header, chunks, job, workers):
+    # Chunk i always uses seed + i, so the output only depends on the seed.
+    from concurrent.futures import ProcessPoolExecutor
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f, ProcessPoolExecutor(workers) as pool:
+        f.write(header)
+        for data in pool.map(job, chunks):
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def build_sudoku_pool(n, holes, count, seed=0, workers=None, path=None):
+    path = path or sudoku_pool_path(n, holes)
+    record_size = len(pack_sudoku(*generate(n, holes=0)))
+    chunks = [(n, holes, seed + i, min(CHUNK, count - start)) for i, start in enumerate(range(0, count, CHUNK))]
+    header = SUDOKU_HEADER.pack(SUDOKU_MAGIC, n, holes, record_size, count)
+    _write_pool(path, header, chunks, _sudoku_chunk, workers)
+    return path
+
+
+def build_code_pool(count, digits=4, seed=0, workers=None, path=None):
+    path = path or codes_pool_path(digits)
+    chunks = [(digits, seed + i, min(CHUNK, count - start)) for i, start in enumerate(range(0, count, CHUNK))]
+    header = CODES_HEADER.pack(CODES_MAGIC, digits, 0, (digits + 1) // 2, count)
+    _write_pool(path, header, chunks, _codes_chunk, workers)
+    return path
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-generate puzzle and room-code pools.")
+    parser.add_argument("kind", choices=("sudoku", "codes"))
+    parser.add_argument("size", type=int, nargs="?", default=4, help="sudoku grid size (4, 9, 16)")
+    parser.add_argument("--holes", type=int, help="cells to dig out (overrides --difficulty)")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTY), default="medium")
+    parser.add_argument("--digits", type=int, default=4, help="room code length")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="default: all cores")
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    if args.kind == "sudoku":
+        holes = args.holes if args.holes is not None else round(DIFFICULTY[args.difficulty] * args.size ** 2)
+        path = build_sudoku_pool(args.size, holes, args.count, args.seed, args.workers, args.out)
+    else:
+        path = build_code_pool(args.count, args.digits, args.seed, args.workers, args.out)
+    print(f"{path}: {args.count} records, {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,155 @@
+import pygame
+import math
+from collections import OrderedDict
+
+
+# --- DIRTY RECTANGLES -------------------------------------------------------
+class DirtyRectRenderer:
+    # track() each region once per frame with a key describing what it shows;
+    # a changed key marks its old and new rect dirty. begin() clips drawing to
+    # the dirty area (False = nothing to draw), present() pushes only those
+    # rects. enabled=False falls back to full redraw + flip().
+
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.screen_rect = screen.get_rect()
+        self._regions = {}
+        self._dirty = []
+        self._full = True
+
+    def invalidate(self, rect=None):
+        if rect is None:
+            self._full = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def track(self, name, rect, key):
+        rect = pygame.Rect(rect)
+        previous = self._regions.get(name)
+        if previous is not None and previous[1] == key and previous[0] == rect:
+            return
+        if previous is not None:
+            self._dirty.append(previous[0])
+        self._dirty.append(rect)
+        self._regions[name] = (rect, key)
+
+    def begin(self):
+        if not self.enabled or self._full:
+            self.screen.set_clip(None)
+            return True
+        if not self._dirty:
+            return False
+        self.screen.set_clip(self._dirty[0].unionall(self._dirty[1:]))
+        return True
+
+    def present(self):
+        if not self.enabled or self._full:
+            pygame.display.flip()
+        elif self._dirty:
+            pygame.display.update([r.clip(self.screen_rect) for r in self._dirty])
+        self.screen.set_clip(None)
+        self._dirty = []
+        self._full = False
+
+
+# --- STATIC LAYER CACHE -----------------------------------------------------
+class LayerCache:
+    # Composited surfaces keyed by a tuple of state flags. build(key) is only
+    # called on a miss; the least recently used entry is dropped past maxsize.
+
+    def __init__(self, build, maxsize=4):
+        self.build = build
+        self.maxsize = maxsize
+        self._layers = OrderedDict()
+
+    def get(self, key):
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = self.build(key)
+            self._layers[key] = layer
+            if len(self._layers) > self.maxsize:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return layer
+
+    def clear(self):
+        self._layers.clear()
+
+
+# --- TEXT CACHE -------------------------------------------------------------
+class TextCache:
+    # font.render() results keyed by (font, text, colour, antialias). Returned
+    # surfaces are shared, so callers must only blit them.
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+TEXT_CACHE = TextCache()
+render_text = TEXT_CACHE.render
+
+
+# --- RESTART ICON SPRITE SHEET ----------------------------------------------
+def draw_restart_arrow(surface, center, angle, radius=16, thickness=4, color=(255, 255, 255)):
+    cx, cy = center
+    start_angle = math.radians(60 + angle)
+    end_angle = math.radians(330 + angle)
+    arc_rect = pygame.Rect(cx - radius, cy - radius, radius * 2, radius * 2)
+    pygame.draw.arc(surface, color, arc_rect, start_angle, end_angle, thickness)
+    head_angle = math.radians(60 + angle)
+    tip_x = cx + radius * math.cos(head_angle)
+    tip_y = cy + radius * math.sin(head_angle)
+    arrow_len = 10 * radius / 16
+    dir_angle = head_angle - math.radians(30)
+    ax = arrow_len * math.cos(dir_angle)
+    ay = arrow_len * math.sin(dir_angle)
+    arrow_points = [(tip_x, tip_y), (tip_x - ax - ay/3, tip_y - ay + ax/3), (tip_x - ax + ay/3, tip_y - ay - ax/3)]
+    pygame.draw.polygon(surface, color, arrow_points)
+
+
+class RestartIconSheet:
+    # Every pose of the restart arrow (idle = angle 0, then one per spin step)
+    # rendered once, supersampled and smoothscaled down for anti-aliasing.
+
+    def __init__(self, radius=16, thickness=4, step=20, size=60, supersample=4):
+        self.step = step
+        self.size = size
+        poses = 360 // step
+        big = size * supersample
+        self.sheet = pygame.Surface((size * poses, size), pygame.SRCALPHA)
+        for i in range(poses):
+            pose = pygame.Surface((big, big), pygame.SRCALPHA)
+            draw_restart_arrow(pose, (big // 2, big // 2), i * step,
+                               radius * supersample, thickness * supersample)
+            self.sheet.blit(pygame.transform.smoothscale(pose, (size, size)), (i * size, 0))
+        if pygame.display.get_surface() is not None:
+            self.sheet = self.sheet.convert_alpha()
+        self._areas = [pygame.Rect(i * size, 0, size, size) for i in range(poses)]
+
+    def draw(self, surface, center, angle):
+        area = self._areas[(angle // self.step) % len(self._areas)]
+        surface.blit(self.sheet, (center[0] - self.size // 2, center[1] - self.size // 2), area)
@@ -0,0 +1,304 @@
+import os
+import sys
+import time
+import pickle
+import struct
+import hashlib
+import itertools
+
+# --- ROOM DEFINITIONS -------------------------------------------------------
+# A room (state, hotspots, events, door code) is described in
+# assets/rooms/<name>.json and compiled at load time into:
+#
+#   * a state vector: every state variable is a bit field of one int
+#     (booleans 1 bit, enums as many bits as their value list needs);
+#   * a dispatch table per hotspot / event, keyed by the bits of the state
+#     that hotspot actually reads, giving the action to run (or no entry:
+#     the hotspot is disabled and clicks fall through to whatever is below).
+#
+# Handling a click or a key is then one dict lookup plus `(state & keep) | set`.
+# Compiled rooms are cached in assets/cache, keyed by the hash of the JSON
+# (so the json module is only imported when a room has to be compiled).
+#
+#   python rooms.py              # compile every room, print table sizes
+#
+# JSON layout:
+#
+#   "state":    {"drawer_open": false, "tv_state": ["OFF", "IMAGE", ...]}
+#               a bool starts at its value, an enum at its first value
+#   "hotspots": [{"name", "rect": [x, y, w, h], "z", "when", "do"}]
+#   "events":   {"code_ok": {"when", "do"}}   fired by the host, no rect
+#   "code":     the door code
+#   "goal":     {"game_won": true}   the state that finishes the room
+#
+# "when" maps variables to required values. "do" is a list of steps, each
+# with an optional "when" of its own: {"set": {...}}, {"toggle": var},
+# {"reset": true}, {"message": text, "ms": n}, {"sound": name},
+# {"call": hook}, {"after": ms, "event": name} (fire an event later), or a
+# nested {"do": [...]} block. Every "when" is checked against the state
+# before the click, so steps read like an if / elif chain. Everything but
+# set / toggle is handed back to the host as an effect, in order; "reset"
+# also emits ("call", "reset") so the host can reset what it keeps outside
+# the state.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ROOM_DIR = os.path.join(ROOT, "assets", "rooms")
+CACHE_DIR = os.path.join(ROOT, "assets", "cache")
+CACHE_MAGIC = b"MRR1"
+CACHE_HEADER = struct.Struct("<4s16s")  # magic, digest of the JSON
+COMPILER_VERSION = 3  # bump when the compiled layout changes
+STEP_KINDS = ("set", "toggle", "reset", "message", "sound", "call", "after", "do")
+
+
+def room_path(name):
+    return os.path.join(ROOM_DIR, name + ".json")
+
+
+def room_cache_path(name):
+    return os.path.join(CACHE_DIR, name + ".room")
+
+
+# --- COMPILER ---------------------------------------------------------------
+def _fields(state):
+    # name -> (shift, width, values, initial index)
+    fields = {}
+    shift = 0
+    for name, spec in state.items():
+        if isinstance(spec, bool):
+            values, initial = [False, True], int(spec)
+        elif isinstance(spec, list) and len(spec) > 0:
+            values, initial = spec, 0
+        else:
+            raise ValueError(f"state {name!r}: expected a bool or a list of values")
+        width = max(1, (len(values) - 1).bit_length())
+        fields[name] = (shift, width, values, initial)
+        shift += width
+    return fields
+
+
+def _reads(entry):
+    # Every variable an entry's behaviour depends on
+    names = set(entry.get("when", {}))
+    if "toggle" in entry:
+        names.add(entry["toggle"])
+    for step in entry.get("do", []):
+        names |= _reads(step)
+    return names
+
+
+def _matches(when, values):
+    return all(values[name] == value for name, value in when.items())
+
+
+class _Compiler:
+    def __init__(self, defn):
+        self.fields = _fields(defn.get("state", {}))
+        self.initial = 0
+        for name, (shift, width, values, initial) in self.fields.items():
+            self.initial |= initial << shift
+        self.actions = {}
+
+    def mask(self, name):
+        if name not in self.fields:
+            raise ValueError(f"unknown state variable {name!r}")
+        shift, width, _, _ = self.fields[name]
+        return ((1 << width) - 1) << shift
+
+    def bits(self, name, value):
+        shift, _, values, _ = self.fields[name]
+        if value not in values:
+            raise ValueError(f"{name!r} has no value {value!r}")
+        return values.index(value) << shift
+
+    def condition(self, when):
+        # (mask, bits) such that state & mask == bits when `when` holds
+        mask = bits = 0
+        for name, value in when.items():
+            mask |= self.mask(name)
+            bits |= self.bits(name, value)
+        return mask, bits
+
+    def action(self, steps, values, where):
+        state = [-1, 0, []]  # keep mask, set bits, effects
+        self.steps(steps, values, where, state)
+        action = (state[0], state[1], tuple(state[2]))
+        return self.actions.setdefault(action, action)  # share equal actions
+
+    def steps(self, steps, values, where, state):
+        for step in steps:
+            if not _matches(step.get("when", {}), values):
+                continue
+            kinds = [kind for kind in STEP_KINDS if kind in step]
+            if len(kinds) != 1 or set(step) - {kinds[0], "when", "ms", "event"}:
+                raise ValueError(f"{where}: bad step {step!r}")
+            kind = kinds[0]
+            if kind in ("set", "toggle"):
+                if kind == "set":
+                    changes = step["set"].items()
+                else:
+                    changes = [(step["toggle"], not values[step["toggle"]])]
+                for name, value in changes:
+                    mask = self.mask(name)
+                    state[0] &= ~mask
+                    state[1] = (state[1] & ~mask) | self.bits(name, value)
+            elif kind == "reset":
+                state[0], state[1] = 0, self.initial
+                state[2].append(("call", "reset"))
+            elif kind == "message":
+                state[2].append(("message", step["message"], step.get("ms", 2000)))
+            elif kind == "after":
+                state[2].append(("after", step["after"], step["event"]))
+            elif kind == "do":
+                self.steps(step["do"], values, where, state)
+            else:
+                state[2].append((kind, step[kind]))
+
+    def entry(self, entry, where):
+        # (mask, table): every combination of the variables the entry reads
+        # is worked out here, once.
+        reads = sorted(_reads(entry))
+        mask = 0
+        for name in reads:
+            mask |= self.mask(name)
+        table = {}
+        choices = [self.fields[name][2] for name in reads]
+        for combo in itertools.product(*choices):
+            values = dict(zip(reads, combo))
+            if not _matches(entry.get("when", {}), values):
+                continue
+            key = 0
+            for name, value in values.items():
+                key |= self.bits(name, value)
+            table[key] = self.action(entry.get("do", []), values, where)
+        return mask, table
+
+
+def compile_room(defn, name="room"):
+    # JSON definition -> plain dict of ints, tuples and dicts (what the cache
+    # pickles and Room wraps).
+    compiler = _Compiler(defn)
+    names, masks, tables, hotspots = [], [], [], []
+    for spot in defn.get("hotspots", []):
+        where = f"{name}: hotspot {spot['name']!r}"
+        mask, table = compiler.entry(spot, where)
+        hotspots.append((len(names), spot["name"], tuple(spot["rect"]), spot.get("z", 0)))
+        names.append(spot["name"])
+        masks.append(mask)
+        tables.append(table)
+    for event, entry in defn.get("events", {}).items():
+        mask, table = compiler.entry(entry, f"{name}: event {event!r}")
+        names.append(event)
+        masks.append(mask)
+        tables.append(table)
+    if len(set(names)) != len(names):
+        raise ValueError(f"{name}: hotspot and event names must be unique")
+    return {
+        "name": name,
+        "fields": {var: field[:3] for var, field in compiler.fields.items()},
+        "initial": compiler.initial,
+        "names": names,
+        "masks": masks,
+        "tables": tables,
+        "hotspots": hotspots,
+        "code": defn.get("code", ""),
+        "goal": compiler.condition(defn.get("goal", {})),
+    }
+
+
+# --- COMPILED ROOM ----------------------------------------------------------
+class Room:
+    def __init__(self, compiled):
+        self.name = compiled["name"]
+        self.fields = compiled["fields"]
+        self.initial = compiled["initial"]
+        self.names = compiled["names"]
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.masks = compiled["masks"]
+        self.tables = compiled["tables"]
+        self.hotspots = compiled["hotspots"]  # (hotspot_id, name, rect, z)
+        self.code = compiled["code"]
+        self.goal = compiled["goal"]
+        self.bits = sum(width for _, width, _ in self.fields.values())
+
+    def get(self, state, name):
+        shift, width, values = self.fields[name]
+        return values[state >> shift & ((1 << width) - 1)]
+
+    def put(self, state, name, value):
+        shift, width, values = self.fields[name]
+        return state & ~(((1 << width) - 1) << shift) | values.index(value) << shift
+
+    def decode(self, state):
+        return {name: values[state >> shift & ((1 << width) - 1)]
+                for name, (shift, width, values) in self.fields.items()}
+
+    def won(self, state):
+        mask, bits = self.goal
+        return bool(mask) and state & mask == bits
+
+    def enabled(self, state, hotspot_id):
+        return (state & self.masks[hotspot_id]) in self.tables[hotspot_id]
+
+    def fire(self, state, hotspot_id):
+        # (new state, effects), or None when the hotspot / event does not
+        # apply in this state
+        action = self.tables[hotspot_id].get(state & self.masks[hotspot_id])
+        if action is None:
+            return None
+        keep, bits, effects = action
+        return state & keep | bits, effects
+
+
+# --- LOADING ----------------------------------------------------------------
+def _digest(data):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(data)
+    h.update(repr(COMPILER_VERSION).encode())
+    return h.digest()
+
+
+def load_room(name):
+    with open(room_path(name), "rb") as f:
+        source = f.read()
+    digest = _digest(source)
+    try:
+        with open(room_cache_path(name), "rb") as f:
+            data = f.read()
+        magic, cached_digest = CACHE_HEADER.unpack_from(data)
+        if magic == CACHE_MAGIC and cached_digest == digest:
+            return Room(pickle.loads(memoryview(data)[CACHE_HEADER.size:]))
+    except (OSError, struct.error, pickle.UnpicklingError, EOFError):
+        pass
+    import json
+    compiled = compile_room(json.loads(source), name)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = room_cache_path(name) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, digest))
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, room_cache_path(name))
+    except OSError:
+        pass  # read-only media: compile again next launch
+    return Room(compiled)
+
+
+def main(names):
+    import json
+    names = names or sorted(f[:-5] for f in os.listdir(ROOM_DIR) if f.endswith(".json"))
+    for name in names:
+        start = time.perf_counter()
+        with open(room_path(name), "rb") as f:
+            compiled = compile_room(json.load(f), name)
+        compile_ms = (time.perf_counter() - start) * 1000
+        load_room(name)  # writes the cache
+        start = time.perf_counter()
+        room = load_room(name)
+        load_ms = (time.perf_counter() - start) * 1000
+        entries = sum(len(table) for table in compiled["tables"])
+        print(f"{name}: {room.bits} state bits, {len(room.hotspots)} hotspots,"
+              f" {len(room.names) - len(room.hotspots)} events, {entries} table entries;"
+              f" compile {compile_ms:.2f} ms, cached load {load_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
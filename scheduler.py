@@ -0,0 +1,54 @@
+import math
+
+import pygame
+
+# --- FRAME SCHEDULER --------------------------------------------------------
+# Runs a loop at full rate only while something on screen moves. Each frame
+# the game calls animate() for every running animation and wake_at(ms) for
+# every upcoming deadline (a delayed room event, a minigame closing). wait()
+# then either ticks the clock at `fps`, or blocks in pygame.event.wait until
+# input arrives or the earliest deadline is due, so a static screen costs no
+# CPU. The loop reads its input from events(): the event that woke it plus
+# everything queued since.
+
+
+class FrameScheduler:
+    def __init__(self, clock, fps=60, idle=True, max_sleep_ms=1000):
+        self.clock = clock
+        self.fps = fps
+        self.idle = idle  # False = always tick at fps (the old busy loop)
+        self.max_sleep_ms = max_sleep_ms  # wake up at least this often anyway
+        self.idle_frames = 0  # frames that slept instead of ticking
+        self._animating = False
+        self._deadline = None
+        self._woken = []
+
+    def animate(self, moving=True):
+        if moving:
+            self._animating = True
+
+    def wake_at(self, ms):
+        # ms (may be fractional) on the pygame.time.get_ticks() clock; None = no deadline
+        if ms is not None and (self._deadline is None or ms < self._deadline):
+            self._deadline = ms
+
+    def events(self):
+        events = self._woken + pygame.event.get()
+        self._woken = []
+        return events
+
+    def wait(self):
+        animating, deadline = self._animating, self._deadline
+        self._animating = False
+        self._deadline = None
+        if self.idle and not animating:
+            timeout = self.max_sleep_ms
+            if deadline is not None:
+                timeout = min(timeout, math.ceil(deadline - pygame.time.get_ticks()))
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    self._woken.append(event)
+                self.idle_frames += 1
+        # Also caps a burst of wake-ups (mouse motion) at fps
+        return self.clock.tick(self.fps)
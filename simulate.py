@@ -0,0 +1,131 @@
+import sys
+import time
+import random
+import argparse
+
+from engine import RoomEngine, VirtualClock
+from rooms import load_room
+
+# --- HEADLESS SIMULATION ----------------------------------------------------
+# Plays a room with no window, audio device or frame clock: the room logic
+# (rooms.py, gamestate.py, engine.py) never imports pygame. Agents click
+# hotspots by name, type codes and let virtual time pass, so thousands of
+# playthroughs run per second and the 2-second win delay costs nothing.
+#
+#   python simulate.py --room main --agent solution
+#   python simulate.py --room main --agent random --runs 10000 --seed 1
+STEP_MS = 250  # virtual time one agent action takes
+WAIT = ("wait",)
+# Minigames resolve at once: the host hook that starts one -> its result event
+MINIGAMES = {"start_sudoku": "sudoku_solved"}
+# Known playthroughs: hotspot names, ("code",) = type the room's code
+SOLUTIONS = {
+    "main": ["drawer", "hammer", "inventory_slot", "glass_case", "glass_case", "return",
+             "keypad", ("code",)] + [WAIT] * 8,
+    "deno": ["drawer", "hammer", "inventory_slot", "glass_case", "glass_case", "return",
+             "keypad", ("code",)],
+}
+
+
+class Simulation:
+    # One engine for every run; starting a run is a snapshot restore.
+
+    def __init__(self, room, code=None):
+        self.room = room
+        self.clock = VirtualClock()
+        self.engine = RoomEngine(room, self.clock, self._effect, code)
+        self.ids = room.ids
+        self.spots = [(hotspot_id, name) for hotspot_id, name, _, _ in room.hotspots if name != "restart"]
+        self.code_event = self.ids.get("code_ok")
+        self.pending = []
+
+    def _effect(self, kind, *args):
+        if kind == "call" and args[0] in MINIGAMES:
+            self.pending.append(MINIGAMES[args[0]])
+
+    def reset(self):
+        self.engine.reset()
+        self.engine.history.clear()
+        self.pending.clear()
+
+    def actions(self):
+        # What an agent can do right now
+        engine = self.engine
+        actions = [name for hotspot_id, name in self.spots if engine.enabled(hotspot_id)]
+        if self.code_event is not None and engine.enabled(self.code_event):
+            actions.append(("code",))
+        actions.append(WAIT)
+        return actions
+
+    def step(self, action):
+        engine = self.engine
+        if action == ("code",):
+            engine.enter_code(engine.code)
+        elif isinstance(action, tuple) and action[0] == "code":
+            engine.enter_code(action[1])
+        elif action != WAIT:
+            engine.fire(self.ids[action])
+        self.clock.advance(STEP_MS)
+        while self.pending:
+            engine.event(self.pending.pop())
+        engine.update()
+        return engine.won()
+
+    def play(self, agent, max_steps):
+        # (won, steps)
+        self.reset()
+        for steps, action in enumerate(agent(self), 1):
+            if self.step(action):
+                return True, steps
+            if steps >= max_steps:
+                break
+        return False, max_steps
+
+
+def solution_agent(name):
+    def agent(sim):
+        return iter(SOLUTIONS[name])
+    return agent
+
+
+def random_agent(rng, wrong_codes=0.5):
+    # Uniform over whatever is possible; half the typed codes are wrong
+    def agent(sim):
+        while True:
+            action = rng.choice(sim.actions())
+            if action == ("code",) and rng.random() < wrong_codes:
+                action = ("code", "".join(rng.choice("0123456789") for _ in range(sim.engine.game.code_length)))
+            yield action
+    return agent
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Play rooms headless, faster than real time.")
+    parser.add_argument("--room", default="main")
+    parser.add_argument("--agent", choices=("random", "solution"), default="random")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sim = Simulation(load_room(args.room))
+    rng = random.Random(args.seed)
+    agent = random_agent(rng) if args.agent == "random" else solution_agent(args.room)
+    wins = steps_to_win = actions = 0
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        won, steps = sim.play(agent, args.max_steps)
+        actions += steps
+        if won:
+            wins += 1
+            steps_to_win += steps
+    wall = time.perf_counter() - start
+    mean = f"{steps_to_win / wins:.1f}" if wins else "-"
+    print(f"{args.room}: {args.runs} {args.agent} runs, {wins} won (mean {mean} actions to win)")
+    print(f"{args.runs / wall:.0f} runs/s, {actions / wall:.0f} actions/s,"
+          f" {sim.clock.now / 1000:.0f} s of game time in {wall:.2f} s")
+    return 0 if wins else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,13 @@
 import pygame
+import os
 import sys
 import random
-
-pygame.init()
+from render import render_text
+from sudoku_gen import Board, generate
+from puzzle_pool import open_pool, sudoku_pool_path
+from scheduler import FrameScheduler
 
 GRID_SIZE = 4
-NUMBERS = [1, 2, 3, 4]
 
 # AUR CHHOTI SIZE
 WIDTH, HEIGHT = 200, 200      # yahan se poora sudoku chhota ho gaya
@@ -14,201 +16,195 @@ CELL_SIZE = WIDTH // GRID_SIZE
 BOTTOM_PANEL_H = 60
 SCREEN_H = HEIGHT + BOTTOM_PANEL_H
 
-screen = pygame.display.set_mode((WIDTH, SCREEN_H))
-pygame.display.set_caption("4x4 Sudoku (small)")
-
-FONT = pygame.font.SysFont(None, 24)
-FONT_SMALL = pygame.font.SysFont(None, 18)
-
 CHECK_RECT = pygame.Rect(WIDTH // 2 - 45, HEIGHT + 15, 90, 30)
-
-def generate_base_solution():
-    return [
-        [1, 2, 3, 4],
-        [3, 4, 1, 2],
-        [2, 1, 4, 3],
-        [4, 3, 2, 1],
-    ]
-
-def permute_numbers(grid):
-    mapping = NUMBERS[:]
-    random.shuffle(mapping)
-    mp = {i + 1: mapping[i] for i in range(4)}
-    new = []
-    for r in range(GRID_SIZE):
-        row = []
-        for c in range(GRID_SIZE):
-            row.append(mp[grid[r][c]])
-        new.append(row)
-    return new
-
-def swap_rows_in_band(grid):
-    g = [row[:] for row in grid]
-    if random.random() < 0.5:
-        g[0], g[1] = g[1], g[0]
-    if random.random() < 0.5:
-        g[2], g[3] = g[3], g[2]
-    return g
-
-def swap_cols_in_band(grid):
-    g = [row[:] for row in grid]
-    if random.random() < 0.5:
-        for r in range(GRID_SIZE):
-            g[r][0], g[r][1] = g[r][1], g[r][0]
-    if random.random() < 0.5:
-        for r in range(GRID_SIZE):
-            g[r][2], g[r][3] = g[r][3], g[r][2]
-    return g
-
-def generate_random_solution():
-    g = generate_base_solution()
-    g = permute_numbers(g)
-    g = swap_rows_in_band(g)
-    g = swap_cols_in_band(g)
-    return g
-
-def make_puzzle_from_solution(solution, holes=5):
-    g = [row[:] for row in solution]
-    cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
-    random.shuffle(cells)
-    for i in range(min(holes, len(cells))):
-        r, c = cells[i]
-        g[r][c] = 0
-    return g
-
-SOLUTION = generate_random_solution()
-PUZZLE = make_puzzle_from_solution(SOLUTION, holes=5)
-
-grid = [row[:] for row in PUZZLE]
-selected = None
-message = ""
-message_color = (255, 255, 255)
-bad_cells = []
-current_key = None
-
-def validate_4x4(grid):
-    bad = []
-    for r in range(GRID_SIZE):
-        seen = {}
-        for c in range(GRID_SIZE):
-            v = grid[r][c]
-            if v == 0:
-                continue
-            if v not in NUMBERS:
-                bad.append((r, c))
-            elif v in seen:
-                bad.append((r, c))
-                bad.append((r, seen[v]))
-            else:
-                seen[v] = c
-    for c in range(GRID_SIZE):
-        seen = {}
-        for r in range(GRID_SIZE):
-            v = grid[r][c]
-            if v == 0:
-                continue
-            if v not in NUMBERS:
-                bad.append((r, c))
-            elif v in seen:
-                bad.append((r, c))
-                bad.append((seen[v], c))
-            else:
-                seen[v] = r
-    bad = list(set(bad))
-    ok = (len(bad) == 0 and
-          all(all(v != 0 for v in row) for row in grid) and
-          grid == SOLUTION)
-    return ok, bad
-
-def draw_grid():
-    screen.fill((255, 255, 255))
-
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE):
-            rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            if (r, c) in bad_cells:
-                pygame.draw.rect(screen, (255, 200, 200), rect)
-            else:
-                pygame.draw.rect(screen, (255, 255, 255), rect)
-
-    for i in range(GRID_SIZE + 1):
-        y = i * CELL_SIZE
-        pygame.draw.line(screen, (0, 0, 0), (0, y), (WIDTH, y), 2)
-    for j in range(GRID_SIZE + 1):
-        x = j * CELL_SIZE
-        pygame.draw.line(screen, (0, 0, 0), (x, 0), (x, HEIGHT), 2)
-
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE):
-            v = grid[r][c]
-            if v != 0:
-                txt = FONT.render(str(v), True, (0, 0, 0))
-                tx = c * CELL_SIZE + CELL_SIZE // 2 - txt.get_width() // 2
-                ty = r * CELL_SIZE + CELL_SIZE // 2 - txt.get_height() // 2
-                screen.blit(txt, (tx, ty))
-
-    if selected is not None:
-        r, c = selected
-        rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-        pygame.draw.rect(screen, (0, 0, 255), rect, 2)
-
-    pygame.draw.rect(screen, (30, 30, 30), (0, HEIGHT, WIDTH, BOTTOM_PANEL_H))
-
-    pygame.draw.rect(screen, (70, 130, 70), CHECK_RECT)
-    pygame.draw.rect(screen, (255, 255, 255), CHECK_RECT, 2)
-    chk_txt = FONT_SMALL.render("CHECK", True, (255, 255, 255))
-    screen.blit(chk_txt, (CHECK_RECT.x + CHECK_RECT.width//2 - chk_txt.get_width()//2,
-                          CHECK_RECT.y + CHECK_RECT.height//2 - chk_txt.get_height()//2))
-
-    msg_txt = FONT_SMALL.render(message, True, message_color)
-    screen.blit(msg_txt, (8, HEIGHT + 8))
-
-    pygame.display.flip()
-
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            x, y = event.pos
-            if y < HEIGHT:
+PUZZLE_HOLES = 5  # of 16; always leaves exactly one solution
+# python puzzle_pool.py sudoku 4 --holes 5 pre-generates these
+SOLVED_DELAY_MS = 800  # keep "Sudoku Solved!" on screen before returning
+
+FONT = None
+FONT_SMALL = None
+PUZZLES = None  # memory-mapped pool from puzzle_pool.py; False = not built
+
+def next_puzzle(rng=random):
+    # (puzzle, solution): picked from the pre-generated pool when there is
+    # one, otherwise generated on the spot.
+    global PUZZLES
+    if PUZZLES is None:
+        PUZZLES = open_pool(sudoku_pool_path(GRID_SIZE, PUZZLE_HOLES)) or False
+    if PUZZLES:
+        return PUZZLES.pick(rng)
+    return generate(GRID_SIZE, holes=PUZZLE_HOLES, rng=rng)
+
+def load_fonts():
+    global FONT, FONT_SMALL
+    if FONT is None:
+        FONT = pygame.font.SysFont(None, 24)
+        FONT_SMALL = pygame.font.SysFont(None, 18)
+
+# --- SCENE ------------------------------------------------------------------
+# The puzzle as a scene: the room pushes it on its scene stack and forwards
+# events to it, running it inside its own window and clock. sudoku.py can
+# still be run on its own (exit code 0 = solved, 1 = closed).
+class SudokuScene:
+    def __init__(self, topleft=(0, 0), rng=random):
+        load_fonts()
+        self.rect = pygame.Rect(topleft, (WIDTH, SCREEN_H))
+        self.surface = pygame.Surface(self.rect.size)
+        self.puzzle, self.solution = next_puzzle(rng)
+        self.board = Board(self.puzzle)
+        self.grid = self.board.grid
+        self.selected = None
+        self.message = ""
+        self.message_color = (255, 255, 255)
+        self.bad_cells = self.board.bad  # live: updated as digits are typed
+        self.solved_at = None
+        self.done = False
+        self.result = False
+        self.started_at = pygame.time.get_ticks()
+        self.finished_at = None
+        self.moves = 0
+        self.errors = 0
+
+    def close(self):
+        self.done = True
+        self.finished_at = pygame.time.get_ticks()
+
+    def summary(self):
+        # The structured result handed back to the room (or over a pipe).
+        end = self.finished_at if self.finished_at is not None else pygame.time.get_ticks()
+        return {"game": "sudoku", "solved": self.result, "time_ms": end - self.started_at,
+                "moves": self.moves, "errors": self.errors}
+
+    def handle_event(self, event):
+        if self.solved_at is not None:
+            return
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            x, y = event.pos[0] - self.rect.x, event.pos[1] - self.rect.y
+            if 0 <= x < WIDTH and 0 <= y < HEIGHT:
                 c = x // CELL_SIZE
                 r = y // CELL_SIZE
-                selected = (r, c)
-            elif CHECK_RECT.collidepoint(event.pos):
-                ok, bad_cells = validate_4x4(grid)
-                if ok:
-                    message = "Sudoku Solved!"
-                    message_color = (0, 255, 0)
-
-                    draw_grid()
-                    pygame.display.flip()
-                    pygame.time.delay(800)
-
-                    pygame.quit()
-                    sys.exit(0)   # ✅ SUCCESS → return TRUE to main.py
-
+                self.selected = (r, c)
+            elif CHECK_RECT.collidepoint((x, y)):
+                if self.board.solved():
+                    self.message = "Sudoku Solved!"
+                    self.message_color = (0, 255, 0)
+                    self.result = True   # ✅ SUCCESS → right door opens
+                    self.solved_at = pygame.time.get_ticks()
                 else:
-                    message = "Repeated / wrong numbers!"
-                    message_color = (255, 80, 80)
+                    self.errors += 1
+                    self.message = "Repeated / wrong numbers!"
+                    self.message_color = (255, 80, 80)
 
         elif event.type == pygame.KEYDOWN:
-            if selected is not None and event.unicode in ("1", "2", "3", "4"):
-                r, c = selected
-                grid[r][c] = int(event.unicode)
-                message = ""
-                bad_cells = []
+            if event.key == pygame.K_ESCAPE:
+                self.close()   # ❌ closed without solving
+            elif self.selected is not None and event.unicode in ("1", "2", "3", "4"):
+                r, c = self.selected
+                self.board.set(r, c, int(event.unicode))
+                self.moves += 1
+                self.message = ""
             elif event.key == pygame.K_BACKSPACE:
-                if selected is not None:
-                    r, c = selected
-                    grid[r][c] = 0
-                    message = ""
-                    bad_cells = []
+                if self.selected is not None:
+                    r, c = self.selected
+                    self.board.set(r, c, 0)
+                    self.moves += 1
+                    self.message = ""
+
+    def update(self, now=None):
+        if self.solved_at is not None:
+            now = pygame.time.get_ticks() if now is None else now
+            if now - self.solved_at >= SOLVED_DELAY_MS:
+                self.close()
 
-    draw_grid()
+    def deadline(self):
+        # When update() closes the scene by itself (ms), or None
+        return None if self.solved_at is None else self.solved_at + SOLVED_DELAY_MS
 
-pygame.quit()
-sys.exit(1)       # ❌ failed / closed without solving
+    def state_key(self):
+        return (tuple(map(tuple, self.grid)), self.selected, self.message, frozenset(self.bad_cells))
 
+    def draw(self, target):
+        screen = self.surface
+        screen.fill((255, 255, 255))
+
+        for r in range(GRID_SIZE):
+            for c in range(GRID_SIZE):
+                rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                if (r, c) in self.bad_cells:
+                    pygame.draw.rect(screen, (255, 200, 200), rect)
+                else:
+                    pygame.draw.rect(screen, (255, 255, 255), rect)
+
+        for i in range(GRID_SIZE + 1):
+            y = i * CELL_SIZE
+            pygame.draw.line(screen, (0, 0, 0), (0, y), (WIDTH, y), 2)
+        for j in range(GRID_SIZE + 1):
+            x = j * CELL_SIZE
+            pygame.draw.line(screen, (0, 0, 0), (x, 0), (x, HEIGHT), 2)
+
+        for r in range(GRID_SIZE):
+            for c in range(GRID_SIZE):
+                v = self.grid[r][c]
+                if v != 0:
+                    txt = render_text(FONT, str(v), True, (0, 0, 0))
+                    tx = c * CELL_SIZE + CELL_SIZE // 2 - txt.get_width() // 2
+                    ty = r * CELL_SIZE + CELL_SIZE // 2 - txt.get_height() // 2
+                    screen.blit(txt, (tx, ty))
+
+        if self.selected is not None:
+            r, c = self.selected
+            rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            pygame.draw.rect(screen, (0, 0, 255), rect, 2)
+
+        pygame.draw.rect(screen, (30, 30, 30), (0, HEIGHT, WIDTH, BOTTOM_PANEL_H))
+
+        pygame.draw.rect(screen, (70, 130, 70), CHECK_RECT)
+        pygame.draw.rect(screen, (255, 255, 255), CHECK_RECT, 2)
+        chk_txt = render_text(FONT_SMALL, "CHECK", True, (255, 255, 255))
+        screen.blit(chk_txt, (CHECK_RECT.x + CHECK_RECT.width//2 - chk_txt.get_width()//2,
+                              CHECK_RECT.y + CHECK_RECT.height//2 - chk_txt.get_height()//2))
+
+        msg_txt = render_text(FONT_SMALL, self.message, True, self.message_color)
+        screen.blit(msg_txt, (8, HEIGHT + 8))
+
+        target.blit(screen, self.rect)
+
+# --- STANDALONE -------------------------------------------------------------
+def play():
+    # Runs one puzzle in its own window; also used by minigame_host workers.
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, SCREEN_H))
+    pygame.display.set_caption("4x4 Sudoku (small)")
+    scene = SudokuScene()
+    scheduler = FrameScheduler(pygame.time.Clock(), fps=60)
+    first_frame = True
+
+    while not scene.done:
+        for event in scheduler.events():
+            if event.type == pygame.QUIT:
+                scene.close()
+            else:
+                scene.handle_event(event)
+        scene.update()
+        scene.draw(screen)
+        pygame.display.flip()
+        if first_frame and os.environ.get("MYSTERY_ROOM_STARTUP_REPORT"):
+            print("startup first_frame", flush=True)
+            if os.environ["MYSTERY_ROOM_STARTUP_REPORT"] == "exit":
+                scene.close()
+        first_frame = False
+        if scene.done:
+            break  # closed: return the result now, not after an idle wait
+        # Nothing animates: sleep until input or the solved message times out
+        scheduler.wake_at(scene.deadline())
+        scheduler.wait()
+
+    return scene.summary()
+
+def main():
+    result = play()
+    pygame.quit()
+    sys.exit(0 if result["solved"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import sys
+import numpy as np
+
+from puzzle_pool import SudokuPool
+from sudoku_gen import box_size, solve
+
+# --- BATCH SUDOKU -----------------------------------------------------------
+# Whole-array versions of sudoku_gen.validate() / solve() for checking puzzle
+# pools and bulk player submissions. Grids are (N, n, n) integer arrays, 0 =
+# empty, digits 1..n, and the same row / column / box rules apply.
+#
+#   python sudoku_batch.py assets/puzzles/sudoku4_h5.pool   # audit a pool
+CELLS_PER_STEP = 1 << 22  # grids * n**3 per step; bounds the temporaries
+_UNITS = {}
+
+
+def _units(n):
+    # (3n, n*n) incidence matrix: unit (row / column / box) x cell. Counting
+    # digits per unit, and spreading unit facts back to cells, are then one
+    # matrix product each over the whole batch.
+    if n not in _UNITS:
+        b = box_size(n)
+        units = np.zeros((3 * n, n * n), dtype=np.float32)
+        for cell in range(n * n):
+            r, c = divmod(cell, n)
+            units[r, cell] = units[n + c, cell] = units[2 * n + (r // b) * b + c // b, cell] = 1
+        _UNITS[n] = units
+    return _UNITS[n]
+
+
+def _chunks(count, n):
+    step = max(1, CELLS_PER_STEP // n ** 3)
+    return ((start, min(start + step, count)) for start in range(0, count, step))
+
+
+def _per_unit(units, planes):
+    # (N, n, n*n) digit planes over cells -> (N, n, 3n) sums per unit. The
+    # whole batch is one matrix product.
+    count, n, cells = planes.shape
+    return (planes.reshape(count * n, cells) @ units.T).reshape(count, n, -1)
+
+
+def _per_cell(units, facts):
+    # (N, n, 3n) per-unit digit facts -> (N, n, n*n) summed over each cell's units
+    count, n, unit_count = facts.shape
+    return (facts.reshape(count * n, unit_count) @ units).reshape(count, n, -1)
+
+
+def _planes(flat, n):
+    # (N, n*n) grids -> (N, n, n*n) float: plane d marks the cells holding d+1
+    return (flat[:, None, :] == np.arange(1, n + 1, dtype=flat.dtype)[:, None]).astype(np.float32)
+
+
+def validate_batch(grids, puzzles=None):
+    # (ok, bad): ok[i] when grid i is full and breaks no rule (and keeps the
+    # givens of puzzles[i]); bad is a (k, 3) array of (grid, row, col).
+    grids = np.asarray(grids)
+    count, n = grids.shape[0], grids.shape[1]
+    units = _units(n)
+    bad = np.zeros(grids.shape, dtype=bool)
+    for start, end in _chunks(count, n):
+        chunk = grids[start:end]
+        planes = _planes(chunk.reshape(len(chunk), n * n), n)
+        repeated = (_per_unit(units, planes) > 1).astype(np.float32)
+        clash = ((planes > 0) & (_per_cell(units, repeated) > 0)).any(axis=1)
+        bad[start:end] = clash.reshape(-1, n, n) | (chunk < 0) | (chunk > n)
+    if puzzles is not None:
+        puzzles = np.asarray(puzzles)
+        bad |= (puzzles != 0) & (grids != puzzles)
+    ok = ~bad.any(axis=(1, 2)) & (grids != 0).all(axis=(1, 2))
+    return ok, np.argwhere(bad)
+
+
+# --- BATCH SOLVER -----------------------------------------------------------
+def _propagate(grids):
+    # Places naked and hidden singles in every grid at once until none is
+    # left. Returns the grids and a mask of grids that hit a contradiction.
+    # Grids drop out of the working set as soon as they stop changing.
+    count, n = grids.shape[0], grids.shape[1]
+    units = _units(n)
+    flat = grids.reshape(count, n * n).copy()
+    broken = np.zeros(count, dtype=bool)
+    broken[np.unique(validate_batch(grids)[1][:, 0])] = True
+    active = np.flatnonzero(~broken & (flat == 0).any(axis=1))
+    while len(active):
+        work = flat[active]
+        empty = (work == 0)[:, None, :]
+        present = (_per_unit(units, _planes(work, n)) > 0).astype(np.float32)  # unit has digit
+        options = empty & (_per_cell(units, present) == 0)                  # (N, n, n*n)
+        option_count = options.sum(axis=1)
+        stuck = (empty[:, 0] & (option_count == 0)).any(axis=1)
+
+        # Hidden singles: a digit with exactly one possible cell in a unit
+        places = _per_unit(units, options.astype(np.float32))
+        hidden_units = ((places == 1) & (present == 0)).astype(np.float32)
+        hidden = options & (_per_cell(units, hidden_units) > 0)
+        naked = options & (option_count == 1)[:, None, :]
+        forced = (hidden | naked).astype(np.float32)
+        forced_per_cell = forced.sum(axis=1)
+        # Two digits forced into one cell, or one digit forced into two cells
+        # of a unit, mean the grid has no solution.
+        stuck |= (forced_per_cell > 1).any(axis=1)
+        stuck |= (_per_unit(units, forced) > 1).any(axis=(1, 2))
+        broken[active[stuck]] = True
+
+        cells = forced_per_cell > 0
+        moving = cells.any(axis=1) & ~stuck
+        digits = (forced * np.arange(1, n + 1, dtype=np.float32)[:, None]).sum(axis=1)
+        work = np.where(cells, digits, work).astype(flat.dtype)
+        flat[active[moving]] = work[moving]
+        active = active[moving]
+    return flat.reshape(grids.shape), broken
+
+
+def solve_batch(puzzles):
+    # (solutions, solved): singles are propagated across the whole batch,
+    # grids left with open cells are finished one by one by backtracking.
+    puzzles = np.asarray(puzzles)
+    n = puzzles.shape[1]
+    solutions = puzzles.copy()
+    solved = np.zeros(len(puzzles), dtype=bool)
+    for start, end in _chunks(len(puzzles), n):
+        grids, broken = _propagate(puzzles[start:end].copy())
+        done = ~broken & (grids != 0).all(axis=(1, 2))
+        for i in np.flatnonzero(~broken & ~done):
+            solution = solve(grids[i].tolist())
+            if solution is not None:
+                grids[i] = solution
+                done[i] = True
+        solutions[start:end] = grids
+        solved[start:end] = done
+    solutions[~solved] = puzzles[~solved]
+    return solutions, solved
+
+
+# --- POOL AUDIT -------------------------------------------------------------
+def unpack_pool(pool):
+    # All records of a puzzle_pool.SudokuPool as (puzzles, solutions) arrays.
+    n = pool.size
+    half = (n * n + 1) // 2
+    records = np.frombuffer(pool.records(), dtype=np.uint8).reshape(pool.count, pool.record_size)
+    cells = np.empty((pool.count, half * 2), dtype=np.int8)
+    cells[:, 0::2] = records[:, :half] & 15
+    cells[:, 1::2] = records[:, :half] >> 4
+    solutions = (cells[:, :n * n] + 1).reshape(-1, n, n)
+    holes = np.unpackbits(records[:, half:], axis=1, bitorder="little")[:, :n * n].reshape(-1, n, n)
+    puzzles = np.where(holes == 1, 0, solutions).astype(np.int8)
+    return puzzles, solutions
+
+
+def audit_pool(path):
+    puzzles, solutions = unpack_pool(SudokuPool(path))
+    valid, _ = validate_batch(solutions, puzzles)
+    solved, ok = solve_batch(puzzles)
+    matches = (solved == solutions).all(axis=(1, 2)) & ok
+    print(f"{path}: {len(puzzles)} puzzles, {int(valid.sum())} valid solutions,"
+          f" {int(matches.sum())} re-solved to the stored solution")
+    return bool(valid.all() and matches.all())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if all([audit_pool(path) for path in sys.argv[1:]]) else 1)
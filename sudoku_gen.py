@@ -0,0 +1,383 @@
+import math
+import random
+
+# --- SUDOKU GENERATOR -------------------------------------------------------
+# N x N puzzles (4, 9, 16) with exactly one solution. Grids are lists of rows,
+# 0 = empty. No pygame here, so worker processes can import it cheaply.
+
+# Fraction of the cells dug out per difficulty. Digging stops early when no
+# further cell can be removed without a second solution appearing.
+DIFFICULTY = {"easy": 0.35, "medium": 0.5, "hard": 0.6}
+# Search nodes one uniqueness check may spend while digging. A check that runs
+# out keeps its clue, so puzzles stay unique and 16x16 digs never stall.
+DIG_BUDGET = 10
+
+
+def box_size(n):
+    b = math.isqrt(n)
+    if b * b != n:
+        raise ValueError(f"grid size must be a square number, got {n}")
+    return b
+
+
+# --- BITMASK SOLVER ---------------------------------------------------------
+class _OutOfBudget(Exception):
+    pass
+
+
+_LAYOUTS = {}
+
+
+def _layout(n):
+    # Per size: (row, column, box) of every cell, and every unit as
+    # (kind, index, cells) with kind 0 = row, 1 = column, 2 = box.
+    if n not in _LAYOUTS:
+        b = box_size(n)
+        where = [(i // n, i % n, (i // n // b) * b + i % n // b) for i in range(n * n)]
+        units = [(kind, index, [i for i in range(n * n) if where[i][kind] == index])
+                 for kind in range(3) for index in range(n)]
+        _LAYOUTS[n] = (where, units)
+    return _LAYOUTS[n]
+
+
+class _Search:
+    # Digit d is bit d-1 in the row / column / box masks. Every node first
+    # fills naked and hidden singles, then branches on the empty cell with the
+    # fewest candidates; it stops as soon as `limit` solutions are found.
+    # ban[i] holds digits cell i may not take (used for uniqueness checks).
+
+    def __init__(self, cells, n, budget=None):
+        self.n = n
+        self.full = (1 << n) - 1
+        self.budget = budget
+        self.where, self.units = _layout(n)
+        self.cells = list(cells)
+        self.masks = ([0] * n, [0] * n, [0] * n)
+        self.ban = [0] * (n * n)
+        self.trail = []
+        self.valid = True
+        for i, v in enumerate(self.cells):
+            if v:
+                bit = 1 << (v - 1)
+                if self._used(i) & bit:
+                    self.valid = False
+                self._set(i, bit)
+        self.count = 0
+        self.guesses = 0
+        self.solution = None
+
+    def _used(self, i):
+        r, c, k = self.where[i]
+        rows, cols, boxes = self.masks
+        return rows[r] | cols[c] | boxes[k]
+
+    def _set(self, i, bit):
+        r, c, k = self.where[i]
+        rows, cols, boxes = self.masks
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[k] |= bit
+        self.cells[i] = bit.bit_length()
+
+    def _place(self, i, bit):
+        self._set(i, bit)
+        self.trail.append((i, bit))
+
+    def _undo(self, mark):
+        rows, cols, boxes = self.masks
+        while len(self.trail) > mark:
+            i, bit = self.trail.pop()
+            r, c, k = self.where[i]
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[k] ^= bit
+            self.cells[i] = 0
+
+    def run(self, limit):
+        if self.valid:
+            try:
+                self._search([i for i, v in enumerate(self.cells) if not v], limit)
+            finally:
+                self._undo(0)
+        return self.count
+
+    def run_excluding(self, i, value):
+        # Is there a solution with `value` NOT at empty cell i? Cheaper than
+        # counting to two. Running out of budget counts as "yes".
+        self.ban[i] = 1 << (value - 1)
+        try:
+            return self.run(1) > 0
+        except _OutOfBudget:
+            return True
+
+    def _propagate(self, empty):
+        # Fill singles until nothing changes; None on a contradiction.
+        cells, ban, full, where = self.cells, self.ban, self.full, self.where
+        masks = rows, cols, boxes = self.masks
+        while True:
+            changed = False
+            options = {}
+            for i in empty:
+                if cells[i]:
+                    continue
+                r, c, k = where[i]
+                candidates = full & ~(rows[r] | cols[c] | boxes[k] | ban[i])
+                if not candidates:
+                    return None
+                if candidates & (candidates - 1):
+                    options[i] = candidates
+                else:
+                    self._place(i, candidates)
+                    changed = True
+            # options may go stale as hidden singles are placed below; it only
+            # ever over-approximates, and every placement is re-checked.
+            for kind, index, unit in self.units:
+                if masks[kind][index] == full:
+                    continue
+                once = twice = 0
+                for i in unit:
+                    if i in options and not cells[i]:
+                        candidates = options[i]
+                        twice |= once & candidates
+                        once |= candidates
+                if (once | masks[kind][index]) != full:
+                    return None
+                singles = once & ~twice & ~masks[kind][index]
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for i in unit:
+                        if i in options and not cells[i] and options[i] & bit:
+                            r, c, k = where[i]
+                            if not (rows[r] | cols[c] | boxes[k]) & bit:
+                                self._place(i, bit)
+                                changed = True
+                            break
+            empty = [i for i in options if not cells[i]]
+            if not changed:
+                return empty
+
+    def _search(self, empty, limit):
+        if self.budget is not None:
+            self.budget -= 1
+            if self.budget < 0:
+                raise _OutOfBudget
+        mark = len(self.trail)
+        empty = self._propagate(empty)
+        if empty is None:
+            self._undo(mark)
+            return False
+        if not empty:
+            self.count += 1
+            if self.solution is None:
+                self.solution = self.cells[:]
+            self._undo(mark)
+            return self.count >= limit
+        best = None
+        best_count = self.n + 1
+        for i in empty:
+            count = (self.full & ~self._used(i) & ~self.ban[i]).bit_count()
+            if count < best_count:
+                best, best_count = i, count
+                if count == 2:
+                    break
+        self.guesses += 1
+        candidates = self.full & ~self._used(best) & ~self.ban[best]
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            inner = len(self.trail)
+            self._place(best, bit)
+            stop = self._search(empty, limit)
+            self._undo(inner)
+            if stop:
+                self._undo(mark)
+                return True
+        self._undo(mark)
+        return False
+
+
+def _flat(grid):
+    return [v for row in grid for v in row]
+
+
+def _rows(cells, n):
+    return [cells[r * n:(r + 1) * n] for r in range(n)]
+
+
+def count_solutions(grid, limit=2):
+    return _Search(_flat(grid), len(grid)).run(limit)
+
+
+def solve(grid):
+    search = _Search(_flat(grid), len(grid))
+    search.run(1)
+    return _rows(search.solution, len(grid)) if search.solution else None
+
+
+def rate(grid):
+    # Number of times the solver had to guess: 0 = pure elimination.
+    search = _Search(_flat(grid), len(grid))
+    search.run(2)
+    return search.guesses
+
+
+# --- GENERATION -------------------------------------------------------------
+def random_solution(n, rng=random):
+    # A valid base pattern with its digits, rows inside bands, bands, columns
+    # inside stacks and stacks shuffled (and maybe transposed).
+    b = box_size(n)
+
+    def shuffled(seq):
+        seq = list(seq)
+        rng.shuffle(seq)
+        return seq
+
+    rows = [band * b + r for band in shuffled(range(b)) for r in shuffled(range(b))]
+    cols = [stack * b + c for stack in shuffled(range(b)) for c in shuffled(range(b))]
+    digits = shuffled(range(1, n + 1))
+    grid = [[digits[(b * (r % b) + r // b + c) % n] for c in cols] for r in rows]
+    if rng.random() < 0.5:
+        grid = [list(col) for col in zip(*grid)]
+    return grid
+
+
+def dig_holes(solution, holes, rng=random, budget=DIG_BUDGET):
+    n = len(solution)
+    cells = _flat(solution)
+    where, units = _layout(n)
+    order = list(range(n * n))
+    rng.shuffle(order)
+    removed = 0
+    for i in order:
+        if removed == holes:
+            break
+        value = cells[i]
+        cells[i] = 0
+        # Cheap case first: the cell's row, column and box still hold every
+        # other digit, so it can only be `value` again.
+        seen = {cells[j] for kind in range(3) for j in units[kind * n + where[i][kind]][2]}
+        if len(seen) == n:  # n - 1 digits plus the 0 just dug
+            removed += 1
+        elif _Search(cells, n, budget).run_excluding(i, value):
+            cells[i] = value  # a second solution appeared: keep this clue
+        else:
+            removed += 1
+    return _rows(cells, n)
+
+
+def generate(n=9, difficulty="medium", holes=None, rng=random, attempts=3):
+    # Returns (puzzle, solution). `holes` overrides the difficulty target; if a
+    # dig cannot reach it the deepest of `attempts` tries is returned.
+    if holes is None:
+        holes = round(DIFFICULTY[difficulty] * n * n)
+    best = None
+    for _ in range(attempts):
+        solution = random_solution(n, rng)
+        puzzle = dig_holes(solution, holes, rng)
+        dug = sum(row.count(0) for row in puzzle)
+        if best is None or dug > best[0]:
+            best = (dug, puzzle, solution)
+        if dug >= holes:
+            break
+    return best[1], best[2]
+
+
+# --- VALIDATION -------------------------------------------------------------
+def validate(grid, puzzle):
+    # (ok, bad cells): ok when the grid is full, breaks no row / column / box
+    # rule and keeps every given of the puzzle. Any such grid is accepted,
+    # not only the stored solution.
+    n = len(grid)
+    b = box_size(n)
+    bad = set()
+    groups = [[(r, c) for c in range(n)] for r in range(n)]
+    groups += [[(r, c) for r in range(n)] for c in range(n)]
+    groups += [[(br + r, bc + c) for r in range(b) for c in range(b)]
+               for br in range(0, n, b) for bc in range(0, n, b)]
+    for group in groups:
+        seen = {}
+        for r, c in group:
+            v = grid[r][c]
+            if v == 0:
+                continue
+            if not 1 <= v <= n:
+                bad.add((r, c))
+            elif v in seen:
+                bad.add((r, c))
+                bad.add(seen[v])
+            else:
+                seen[v] = (r, c)
+    for r in range(n):
+        for c in range(n):
+            if puzzle[r][c] and grid[r][c] != puzzle[r][c]:
+                bad.add((r, c))
+    ok = not bad and all(all(v != 0 for v in row) for row in grid)
+    return ok, sorted(bad)
+
+
+# --- LIVE BOARD -------------------------------------------------------------
+class Board:
+    # Incremental version of validate() for a grid being typed into. Each
+    # row / column / box keeps the cells holding each digit plus a bitmask of
+    # the digits it holds more than once, so set() touches only the three
+    # units of the changed cell, whatever the size of the board. `bad` is
+    # the live set of conflicting (or overwritten given) cells.
+
+    def __init__(self, puzzle):
+        self.n = n = len(puzzle)
+        self.puzzle = puzzle
+        self.grid = [[0] * n for _ in range(n)]
+        self.where = _layout(n)[0]
+        self.holders = [[set() for _ in range(n + 1)] for _ in range(3 * n)]
+        self.dups = [0] * (3 * n)
+        self.bad = set()
+        self.filled = 0
+        for r in range(n):
+            for c in range(n):
+                if puzzle[r][c]:
+                    self.set(r, c, puzzle[r][c])
+
+    def _units(self, r, c):
+        return r, self.n + c, 2 * self.n + self.where[r * self.n + c][2]
+
+    def set(self, r, c, value):
+        old = self.grid[r][c]
+        if old == value:
+            return
+        units = self._units(r, c)
+        changed = {(r, c)}
+        if old:
+            self.filled -= 1
+            for unit in units:
+                cells = self.holders[unit][old]
+                cells.discard((r, c))
+                if len(cells) == 1:
+                    self.dups[unit] &= ~(1 << (old - 1))
+                    changed |= cells
+        self.grid[r][c] = value
+        if value:
+            self.filled += 1
+            for unit in units:
+                cells = self.holders[unit][value]
+                cells.add((r, c))
+                if len(cells) == 2:
+                    self.dups[unit] |= 1 << (value - 1)
+                    changed |= cells
+        for cell in changed:
+            self._check(*cell)
+
+    def _check(self, r, c):
+        value = self.grid[r][c]
+        given = self.puzzle[r][c]
+        bad = bool(given) and value != given
+        if value and not bad:
+            bit = 1 << (value - 1)
+            bad = any(self.dups[unit] & bit for unit in self._units(r, c))
+        if bad:
+            self.bad.add((r, c))
+        else:
+            self.bad.discard((r, c))
+
+    def solved(self):
+        return self.filled == self.n * self.n and not self.bad
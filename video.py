@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+
+import pygame
+
+# --- VIDEO PLAYER -----------------------------------------------------------
+# Plays a video file into a small rect without ever blocking the game loop.
+# A worker thread decodes, resizes and converts frames to RGB with OpenCV and
+# feeds them to a bounded queue (it simply waits while the queue is full, so
+# memory stays at `buffer` frames). The loop calls frame() once per render:
+# frames whose time has come are taken off the queue, all but the newest are
+# dropped when rendering falls behind, and the newest is wrapped in a Surface
+# with pygame.image.frombuffer, sharing the decoded pixels instead of copying
+# them. pause() / play() stop and restart the playback clock; the worker
+# starts on the first play() and only then imports OpenCV, so a game whose
+# TV is never switched on never loads it.
+
+
+def _ms():
+    return time.perf_counter() * 1000
+
+
+class VideoPlayer:
+    def __init__(self, path, size, loop=True, buffer=4, clock=_ms):
+        self.path = path
+        self.size = tuple(size)
+        self.loop = loop
+        self.clock = clock
+        self.playing = False
+        self.dropped = 0  # frames decoded but never shown
+        self._queue = queue.Queue(maxsize=buffer)
+        self._stop = threading.Event()
+        self._thread = None
+        self._position = 0.0  # playback time, ms; only advances while playing
+        self._last = None
+        self._next = None  # (pts, pixels) taken off the queue, not due yet
+        self._pixels = None  # keeps the buffer behind _surface alive
+        self._surface = None
+
+    def play(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode, name="video", daemon=True)
+            self._thread.start()
+        if not self.playing:
+            self.playing = True
+            self._last = self.clock()
+
+    def pause(self):
+        if self.playing:
+            self._advance()
+            self.playing = False
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _advance(self):
+        now = self.clock()
+        self._position += now - self._last
+        self._last = now
+
+    def frame(self):
+        # The Surface to show now: the newest decoded frame that is due, or
+        # the previous one when the decoder has nothing newer (None at first)
+        if not self.playing:
+            return self._surface
+        self._advance()
+        due = None
+        while True:
+            if self._next is None:
+                try:
+                    self._next = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self._next[0] > self._position:
+                break
+            if due is not None:
+                self.dropped += 1
+            due, self._next = self._next, None
+        if due is not None:
+            self._pixels = due[1]
+            self._surface = pygame.image.frombuffer(self._pixels, self.size, "RGB")
+        return self._surface
+
+    # --- WORKER THREAD ---
+    def _decode(self):
+        import cv2
+        capture = cv2.VideoCapture(self.path)
+        frame_ms = 1000 / (capture.get(cv2.CAP_PROP_FPS) or 30)
+        pts = 0.0
+        decoded = False  # something since the last rewind (an empty file would spin)
+        while not self._stop.is_set():
+            ok, frame = capture.read()
+            if not ok:
+                if not (self.loop and decoded):
+                    break
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                decoded = False
+                continue
+            decoded = True
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+            pixels = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # a fresh contiguous array
+            while not self._stop.is_set():
+                try:
+                    self._queue.put((pts, pixels), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            pts += frame_ms
+        capture.release()